@@ -0,0 +1,19 @@
+# Gunicorn settings for the Passport Photo Editor
+# Session metadata and the InSPyReNet model live in process memory, so one
+# worker serves everything and threads provide the concurrency: PIL, OpenCV,
+# NumPy and torch release the GIL, so uploads and resizes overlap inference.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+# GUNICORN_WORKER_CLASS=gevent also works: server.py runs inference on the
+# hub's native threadpool so greenlets keep serving I/O during a forward pass
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 120
+# Idle keep-alive connections wait in the gthread selector loop instead of
+# holding a thread, so the page/preview/result fetches reuse one connection
+keepalive = 5
+# The worker heartbeat file is touched constantly; keep it on tmpfs when present
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
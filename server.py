@@ -4,12 +4,16 @@ Modern Photo Editing Server using InSPyReNet
 4-Step Workflow: Upload → Choose Size → Adjust Position → Remove Background
 """
 
-import os, io, base64, uuid, logging
+import os, io, re, sys, secrets, functools, logging, threading, queue, time, contextlib, shutil, tempfile, gzip, hashlib
 import cv2
 import numpy as np
 from pathlib import Path
-from flask import Flask, request, jsonify, send_file, render_template_string, send_from_directory
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from flask import Flask, Request, Response, request, jsonify, redirect, send_file, send_from_directory
 from flask_cors import CORS
+from werkzeug.http import http_date, is_resource_modified
 from PIL import Image
 
 logging.basicConfig(level=logging.INFO)
@@ -17,13 +21,30 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key')
+# Reject oversized bodies before Werkzeug reads them (multipart overhead on top of 50MB)
+app.config['MAX_CONTENT_LENGTH'] = 51 * 1024 * 1024
+# Session blobs are served from disk through wsgi.file_wrapper (sendfile under
+# gunicorn). Behind a proxy that understands X-Sendfile, USE_X_SENDFILE=1 hands
+# the file to the proxy and the worker sends headers only.
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
 CORS(app)
 
-temp_images = {}
+# Session image bytes live on disk under SESSION_DIR/<sid>/; temp_images only
+# keeps small per-session metadata, in LRU order capped at MAX_SESSIONS. A
+# sweeper thread drops sessions that have not been written to for SESSION_TTL
+# seconds.
+temp_images = OrderedDict()
+SESSION_DIR = Path(tempfile.gettempdir()) / 'passport-photo-sessions'
+SESSION_TTL = 3600
+MAX_SESSIONS = int(os.environ.get('MAX_SESSIONS', 256))
+_sessions_lock = threading.Lock()
 _model = None
 _model_loaded = False
+_model_lock = threading.Lock()
 
 try:
+    import torch
+    import torch.nn.functional as F
     from transparent_background import Remover
     INSPYRENET_AVAILABLE = True
     logger.info("✅ InSPyReNet available")
@@ -31,41 +52,612 @@ except ImportError:
     INSPYRENET_AVAILABLE = False
     logger.error("❌ InSPyReNet not available")
 
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+try:
+    from cykooz.resizer import CropBox, FilterType, ResizeAlg, Resizer, ResizeOptions
+    _RESIZE_ALGS = {'lanczos': ResizeAlg.convolution(FilterType.lanczos3), 'box': ResizeAlg.convolution(FilterType.box)}
+    _RESIZE_OPTIONS = {kind: ResizeOptions(resize_alg=alg) for kind, alg in _RESIZE_ALGS.items()}
+    SIMD_RESIZE_AVAILABLE = True
+    logger.info("✅ SIMD resizer available")
+except ImportError:
+    SIMD_RESIZE_AVAILABLE = False
+    logger.info("ℹ️ SIMD resizer not available, using Pillow")
+
+try:
+    import pyspng
+    SPNG_AVAILABLE = True
+    logger.info("✅ libspng available")
+except ImportError:
+    SPNG_AVAILABLE = False
+    logger.info("ℹ️ libspng not available, using Pillow for PNG")
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_420, TJSAMP_444
+    _turbojpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+    logger.info("✅ libjpeg-turbo available")
+except (ImportError, OSError, RuntimeError):
+    TURBOJPEG_AVAILABLE = False
+    logger.info("ℹ️ libjpeg-turbo not available, using Pillow for JPEG")
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    from gevent import get_hub
+    from gevent.monkey import is_module_patched
+    _GEVENT = is_module_patched('threading')
+except ImportError:
+    _GEVENT = False
+
+# Inference runs on CUDA with FP16 autocast when a GPU is present. Without one
+# the lighter 'fast' checkpoint is used, since 'base' on CPU takes seconds.
+# INSPYRENET_DEVICE pins the device (e.g. 'cpu' on a shared GPU host, or
+# 'cuda:1'); INSPYRENET_MODE overrides the checkpoint choice; INSPYRENET_JIT=1
+# enables the TorchScript path (slower first start, traced graph cached on disk).
+_device = os.environ.get('INSPYRENET_DEVICE') or ('cuda:0' if INSPYRENET_AVAILABLE and torch.cuda.is_available() else 'cpu')
+_use_cuda = INSPYRENET_AVAILABLE and _device.startswith('cuda')
+# torch.compile (CUDA graphs) on by default on GPU; INSPYRENET_COMPILE=0/1 overrides
+_compile = INSPYRENET_AVAILABLE and hasattr(torch, 'compile') and \
+    os.environ.get('INSPYRENET_COMPILE', '1' if _use_cuda else '0') == '1'
+
 def get_model():
     global _model, _model_loaded
     if not INSPYRENET_AVAILABLE:
         raise ValueError("InSPyReNet not available")
     if not _model_loaded:
-        logger.info("🚀 Loading InSPyReNet model...")
-        _model = Remover(mode='base')
-        _model_loaded = True
-        logger.info("✅ Model loaded")
+        with _model_lock:
+            if not _model_loaded:
+                mode = os.environ.get('INSPYRENET_MODE', 'base' if _use_cuda else 'fast')
+                logger.info(f"🚀 Loading InSPyReNet model ({mode}, {_device})...")
+                jit = os.environ.get('INSPYRENET_JIT') == '1'
+                _model = Remover(mode=mode, device=_device, jit=jit)
+                # Only fixed-shape checkpoints compile cleanly; dynamic ones would
+                # recompile for every new image size. ONNX export needs the raw module.
+                if _compile and not jit and not _use_onnx and _static_base_size(_model):
+                    _model.model = torch.compile(_model.model, mode='reduce-overhead')
+                    logger.info("🔧 InSPyReNet compiled with torch.compile")
+                _model_loaded = True
+                logger.info("✅ Model loaded")
     return _model
 
-# Face detection using OpenCV
+_IMAGENET_MEAN = (0.485, 0.456, 0.406)
+_IMAGENET_STD = (0.229, 0.224, 0.225)
+
+# CPU deployments can run a dynamically INT8-quantized ONNX export of the
+# network through onnxruntime instead of FP32 torch. INSPYRENET_ONNX names the
+# .onnx file; if it does not exist it is exported from the loaded checkpoint
+# on first use. Only static-resize checkpoints have a fixed input shape.
+# On GPU, INSPYRENET_BACKEND=trt runs the FP32 export as an FP16 TensorRT
+# engine through onnxruntime-gpu's TensorRT provider instead; built engines
+# are cached next to the .onnx file so only the first start pays for the build.
+_ONNX_PATH = os.environ.get('INSPYRENET_ONNX')
+_use_trt = _use_cuda and os.environ.get('INSPYRENET_BACKEND') == 'trt'
+_use_onnx = INSPYRENET_AVAILABLE and ONNX_AVAILABLE and bool(_ONNX_PATH) and (_use_trt or not _use_cuda)
+_onnx_session = None
+
+def export_onnx(model, path, int8=False):
+    """Export the segmentation network to ONNX, optionally with INT8 weights"""
+    out = path.with_suffix('.fp32.onnx') if int8 else path
+    dummy = torch.zeros(1, 3, *_static_base_size(model), device=next(model.model.parameters()).device)
+    logger.info(f"🔧 Exporting InSPyReNet to {path}...")
+    torch.onnx.export(model.model, dummy, str(out), opset_version=17,
+                      input_names=['image'], output_names=['mask'],
+                      dynamic_axes={'image': {0: 'batch'}, 'mask': {0: 'batch'}})
+    if int8:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(str(out), str(path), weight_type=QuantType.QInt8)
+        out.unlink()
+
+def get_onnx_session():
+    global _onnx_session
+    if _onnx_session is None:
+        path = Path(_ONNX_PATH)
+        if not path.exists():
+            export_onnx(get_model(), path, int8=not _use_trt)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if _use_trt:
+            providers = [('TensorrtExecutionProvider', {'device_id': torch.device(_device).index or 0,
+                                                        'trt_fp16_enable': True, 'trt_engine_cache_enable': True,
+                                                        'trt_engine_cache_path': str(path.parent)}),
+                         'CUDAExecutionProvider']
+        else:
+            providers = ['CPUExecutionProvider']
+        _onnx_session = ort.InferenceSession(str(path), options, providers=providers)
+        logger.info(f"✅ ONNX session ready ({_onnx_session.get_providers()[0]})")
+    return _onnx_session
+
+def _segment_batch_onnx(images, base_size):
+    """ONNX path: resize and normalize with OpenCV, run the INT8 or TensorRT graph"""
+    mean = np.array(_IMAGENET_MEAN, np.float32)
+    std = np.array(_IMAGENET_STD, np.float32)
+    h, w = base_size
+    x = np.stack([
+        (cv2.resize(np.asarray(img), (w, h), interpolation=cv2.INTER_AREA).astype(np.float32) / 255 - mean) / std
+        for img in images
+    ]).transpose(0, 3, 1, 2)
+    preds = get_onnx_session().run(None, {'image': np.ascontiguousarray(x)})[0]
+    results = []
+    for img, pred in zip(images, preds):
+        alpha = cv2.resize(pred[0], img.size, interpolation=cv2.INTER_LINEAR)
+        alpha = (np.clip(alpha, 0, 1) * 255).astype(np.uint8)
+        results.append(Image.fromarray(np.dstack([np.asarray(img), alpha]), 'RGBA'))
+    return results
+
+def _autocast():
+    return torch.autocast('cuda', dtype=torch.float16) if _use_cuda else contextlib.nullcontext()
+
+def _static_base_size(model):
+    """The fixed network input size, or None for dynamic-resize checkpoints"""
+    meta = getattr(model, 'meta', None)
+    size = meta.get('base_size') if meta else None
+    return tuple(size) if size and getattr(model, 'resize', 'static') == 'static' else None
+
+def _gpu_preprocess(images, base_size, device):
+    """Upload uint8 pixels once, then resize and normalize on the GPU"""
+    xs = []
+    for img in images:
+        x = torch.from_numpy(np.asarray(img)).to(device, non_blocking=True)
+        x = x.permute(2, 0, 1).unsqueeze(0).float().div_(255)
+        xs.append(F.interpolate(x, size=base_size, mode='bilinear', antialias=True, align_corners=False))
+    mean = torch.tensor(_IMAGENET_MEAN, device=device).view(1, 3, 1, 1)
+    std = torch.tensor(_IMAGENET_STD, device=device).view(1, 3, 1, 1)
+    return (torch.cat(xs) - mean) / std
+
+def _segment_batch(images):
+    """Run one forward pass over several RGB images and return RGBA cut-outs"""
+    model = get_model()
+    base_size = _static_base_size(model)
+    if _use_onnx and base_size:
+        return _segment_batch_onnx(images, base_size)
+    if _use_cuda and base_size:
+        x = _gpu_preprocess(images, base_size, model.device)
+    else:
+        xs = [model.transform(img) for img in images]
+        if len(xs) == 1 or any(x.shape != xs[0].shape for x in xs):
+            # Dynamic-resize checkpoints give per-image shapes; run them one by one
+            with _autocast():
+                return [model.process(img, type='rgba') for img in images]
+        x = torch.stack(xs).to(model.device, non_blocking=True)
+    with torch.no_grad(), _autocast():
+        preds = model.model(x)
+    results = []
+    for img, pred in zip(images, preds):
+        pred = F.interpolate(pred.unsqueeze(0).float(), img.size[::-1], mode='bilinear', align_corners=True)
+        # Quantize on the device so only a uint8 matte crosses back to the host
+        alpha = pred.squeeze().clamp_(0, 1).mul_(255).to(torch.uint8).cpu().numpy()
+        results.append(Image.fromarray(np.dstack([np.asarray(img), alpha]), 'RGBA'))
+    return results
+
+class InferenceBatcher:
+    """Collects concurrent segment() calls and runs them as one forward pass"""
+    def __init__(self, max_batch, window):
+        self.max_batch = max_batch
+        self.window = window
+        self.queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, image, timeout=120):
+        future = Future()
+        self.queue.put((image, future))
+        return future.result(timeout=timeout)
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(items) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                results = run_native(_segment_batch, [image for image, _ in items])
+                for (_, future), result in zip(items, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Batch inference error: {e}")
+                for _, future in items:
+                    future.set_exception(e)
+
+# Batching only pays off on the GPU; INSPYRENET_BATCH=1 disables it.
+# INSPYRENET_BATCH_WINDOW_MS trades first-request latency for fuller batches.
+_BATCH_SIZE = int(os.environ.get('INSPYRENET_BATCH', 4 if _use_cuda else 1))
+_BATCH_WINDOW = float(os.environ.get('INSPYRENET_BATCH_WINDOW_MS', 20)) / 1000
+_batcher = InferenceBatcher(_BATCH_SIZE, _BATCH_WINDOW) if INSPYRENET_AVAILABLE and _BATCH_SIZE > 1 else None
+# Unbatched forward passes already use every core through torch's intra-op
+# pool, so request threads queue here instead of oversubscribing the CPU.
+# Uploads, crops and downloads on other threads keep running meanwhile.
+_inference_slots = threading.BoundedSemaphore(int(os.environ.get('INSPYRENET_CONCURRENCY', 1)))
+
+def run_native(fn, *args):
+    """Call fn on a real OS thread when running under gevent workers"""
+    # A forward pass never yields to the gevent hub; run inline it would stall
+    # every other greenlet's upload and download until the model finishes
+    if _GEVENT:
+        return get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+# The network works at ~1024 px anyway; larger inputs are segmented on a
+# box-downscaled copy and only the matte is upsampled back
+SEGMENT_MAX_SIDE = 1024
+
+# Mattes of recently segmented images, keyed by a hash of their pixels.
+# Re-running background removal with another color on the same crop (or
+# auto-processing the same photo again) skips the forward pass entirely.
+MASK_CACHE_SIZE = 32
+_mask_cache = OrderedDict()
+_mask_cache_lock = threading.Lock()
+
+def _segment_alpha(image):
+    """The model's alpha matte for an RGB image, as a uint8 array"""
+    small = image
+    if max(image.size) > SEGMENT_MAX_SIDE:
+        k = SEGMENT_MAX_SIDE / max(image.size)
+        small = box_resize(image, (max(1, round(image.width * k)), max(1, round(image.height * k))))
+    if _batcher is not None:
+        result = _batcher.submit(small)
+    else:
+        with _inference_slots:
+            result = run_native(_segment_batch, [small])[0]
+    alpha = np.asarray(result.getchannel('A'))
+    if small is not image:
+        alpha = cv2.resize(alpha, image.size, interpolation=cv2.INTER_LINEAR)
+    return alpha
+
+def segment(image):
+    """Run InSPyReNet on an RGB image and return the RGBA cut-out"""
+    key = (image.size, hashlib.blake2b(image.tobytes(), digest_size=16).digest())
+    with _mask_cache_lock:
+        alpha = _mask_cache.get(key)
+        if alpha is not None:
+            _mask_cache.move_to_end(key)
+    if alpha is None:
+        alpha = _segment_alpha(image)
+        with _mask_cache_lock:
+            _mask_cache[key] = alpha
+            if len(_mask_cache) > MASK_CACHE_SIZE:
+                _mask_cache.popitem(last=False)
+    return Image.fromarray(np.dstack([np.asarray(image), alpha]), 'RGBA')
+
+def warm_model():
+    """Load the model and run one dummy pass so kernels are ready for the first user"""
+    try:
+        # A compiled model builds one graph per batch size; pay for all of them here
+        for n in range(1, (_BATCH_SIZE if _compile else 1) + 1):
+            _segment_batch([Image.new('RGB', (64, 64))] * n)
+        logger.info("🔥 Model warmed up")
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {e}")
+
+if INSPYRENET_AVAILABLE:
+    threading.Thread(target=warm_model, daemon=True).start()
+
+# Lanczos3 resampling: cykooz.resizer (AVX2/SSE4.1/NEON) with Pillow fallback.
+# Resizer keeps internal buffers and is not re-entrant, so each thread gets its
+# own small LRU of resizers keyed by (src_size, dst_size). The workload only
+# sees a few dozen pairs (one per photo standard), so filter coefficients and
+# buffers are reused; the whole-image ResizeOptions are built once at import.
+_RESIZER_CACHE_SIZE = 32
+_resizer_local = threading.local()
+def _get_resizer(src_size, dst_size):
+    cache = getattr(_resizer_local, 'cache', None)
+    if cache is None:
+        cache = _resizer_local.cache = OrderedDict()
+    key = (src_size, dst_size)
+    resizer = cache.get(key)
+    if resizer is None:
+        resizer = cache[key] = Resizer()
+        if len(cache) > _RESIZER_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return resizer
+
+def _resize(img, size, box, kind, resample):
+    size = (int(size[0]), int(size[1]))
+    if SIMD_RESIZE_AVAILABLE and img.mode in ('RGB', 'RGBA', 'L'):
+        # RGBA is premultiplied by the resizer, so edges do not pick up dark halos
+        options = _RESIZE_OPTIONS[kind]
+        if box is not None:
+            l, t, r, b = box
+            options = ResizeOptions(resize_alg=_RESIZE_ALGS[kind], crop_box=CropBox(l, t, r - l, b - t))
+        dst = Image.new(img.mode, size)
+        _get_resizer(img.size, size).resize_pil(img, dst, options)
+        return dst
+    # Pillow box-reduces by an integer factor first when the downscale is >3x,
+    # so Lanczos only convolves the much smaller intermediate image
+    return img.resize(size, resample, box=box, reducing_gap=3.0)
+
+def lanczos_resize(img, size, box=None):
+    """Resize with Lanczos3, using the SIMD resizer when available.
+
+    box is an optional (left, top, right, bottom) source window; only that
+    region is resampled, without materialising an intermediate crop.
+    """
+    return _resize(img, size, box, 'lanczos', Image.Resampling.LANCZOS)
+
+def box_resize(img, size):
+    """Downscale with a box filter (area average), SIMD when available"""
+    return _resize(img, size, None, 'box', Image.Resampling.BOX)
+
+def blob_path(sid, name):
+    return SESSION_DIR / sid / name
+
+def _blob_tmp(path):
+    """A temp file next to a blob, unique so concurrent writers never share one"""
+    return tempfile.NamedTemporaryFile(dir=path.parent, prefix=f'.{path.name}-', suffix='.tmp', delete=False)
+
+def save_blob(sid, name, data, **meta):
+    """Atomically write a session blob and return its ETag.
+
+    The replace, the session's ETag and any extra meta fields (e.g.
+    processed_mimetype) are updated together under the sessions lock, so the
+    metadata always describes the file on disk.
+    """
+    path = blob_path(sid, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    etag = hashlib.md5(data, usedforsecurity=False).hexdigest()
+    with _blob_tmp(path) as f:
+        f.write(data)
+    with _sessions_lock:
+        os.replace(f.name, path)
+        session = temp_images.get(sid)
+        if session is not None:
+            session['etags'][name] = etag
+            session.update(meta)
+            temp_images.move_to_end(sid)
+    os.utime(path.parent)
+    return etag
+
+def send_blob(sid, name, mimetype, **kwargs):
+    """Serve a session blob with its content-hash ETag; 304 on If-None-Match"""
+    session = temp_images.get(sid)
+    if session is None:
+        # Evicted or swept since the route checked for it
+        return jsonify({'error': 'Not found'}), 404
+    etag = session['etags'].get(name, True)
+    return send_file(blob_path(sid, name), mimetype=mimetype, etag=etag, conditional=True, **kwargs)
+
+def save_blob_stream(sid, name, stream, max_size, chunk_size=1024 * 1024):
+    """Copy a file object into a session blob in chunks; None if it exceeds max_size"""
+    path = blob_path(sid, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    size = 0
+    with _blob_tmp(path) as f:
+        while chunk := stream.read(chunk_size):
+            size += len(chunk)
+            if size > max_size:
+                break
+            f.write(chunk)
+    if size > max_size:
+        os.unlink(f.name)
+        return None
+    os.replace(f.name, path)
+    os.utime(path.parent)
+    return size
+
+class UploadRequest(Request):
+    """Spools multipart file parts into SESSION_DIR instead of an anonymous temp file"""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Same filesystem as the session blobs, so save_blob_upload can hard-link
+        # the part into place instead of copying it a second time
+        SESSION_DIR.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=SESSION_DIR, prefix='.upload-')
+
+app.request_class = UploadRequest
+
+def save_blob_upload(sid, name, stream, max_size):
+    """Link a spooled upload in as a session blob; None if it exceeds max_size"""
+    spool = getattr(stream, 'name', None)
+    if not isinstance(spool, str) or Path(spool).parent != SESSION_DIR:
+        return save_blob_stream(sid, name, stream, max_size)
+    stream.flush()
+    size = os.fstat(stream.fileno()).st_size
+    if size > max_size:
+        return None
+    path = blob_path(sid, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        # The spool file unlinks its own name when the request closes it
+        os.link(spool, path)
+    except OSError:
+        stream.seek(0)
+        return save_blob_stream(sid, name, stream, max_size)
+    os.utime(path.parent)
+    return size
+
+def add_session(sid, meta):
+    """Register session metadata, evicting the least recently written sessions"""
+    with _sessions_lock:
+        temp_images[sid] = meta
+        while len(temp_images) > MAX_SESSIONS:
+            old, _ = temp_images.popitem(last=False)
+            forget_original(old)
+            shutil.rmtree(SESSION_DIR / old, ignore_errors=True)
+
+# Decoded originals are kept in an LRU bounded by DECODED_CACHE_MB so retries
+# (e.g. a different background color) skip the codec pass. Cached images are
+# shared between requests and must not be modified in place.
+DECODED_CACHE_BYTES = int(os.environ.get('DECODED_CACHE_MB', 1024)) * 1024 * 1024
+_decoded = OrderedDict()
+_decoded_bytes = 0
+_decoded_lock = threading.Lock()
+
+def _image_nbytes(img):
+    return img.width * img.height * len(img.getbands())
+
+def decode_image(path):
+    """Decode an image file, JPEGs through libjpeg-turbo when available"""
+    if TURBOJPEG_AVAILABLE:
+        # Sniff the header; only JPEGs are read whole for libjpeg-turbo
+        with open(path, 'rb') as f:
+            head = f.read(32)
+            data = head + f.read() if sniff_format(head) == 'jpeg' else None
+        if data is not None:
+            try:
+                return Image.fromarray(_turbojpeg.decode(data, pixel_format=TJPF_RGB), 'RGB')
+            except (OSError, ValueError):
+                pass  # CMYK or damaged streams: let Pillow deal with them
+    img = Image.open(path)
+    img.load()
+    return img
+
+def load_original(sid):
+    """Return the decoded upload for a session, from cache when possible"""
+    global _decoded_bytes
+    with _decoded_lock:
+        img = _decoded.get(sid)
+        if img is not None:
+            _decoded.move_to_end(sid)
+            return img
+    img = decode_image(blob_path(sid, 'original'))
+    with _decoded_lock:
+        if sid not in _decoded:
+            _decoded[sid] = img
+            _decoded_bytes += _image_nbytes(img)
+            while _decoded_bytes > DECODED_CACHE_BYTES and len(_decoded) > 1:
+                _, old = _decoded.popitem(last=False)
+                _decoded_bytes -= _image_nbytes(old)
+    return img
+
+def forget_original(sid):
+    global _decoded_bytes
+    with _decoded_lock:
+        img = _decoded.pop(sid, None)
+        if img is not None:
+            _decoded_bytes -= _image_nbytes(img)
+
+def _sweep_sessions():
+    while True:
+        time.sleep(300)
+        cutoff = time.time() - SESSION_TTL
+        for d in SESSION_DIR.glob('*'):
+            try:
+                if d.stat().st_mtime >= cutoff:
+                    continue
+                if d.name.startswith('.upload-'):
+                    # Spool file left behind by a crashed or aborted upload
+                    d.unlink()
+                else:
+                    with _sessions_lock:
+                        temp_images.pop(d.name, None)
+                    forget_original(d.name)
+                    shutil.rmtree(d, ignore_errors=True)
+            except OSError:
+                pass
+
+threading.Thread(target=_sweep_sessions, daemon=True).start()
+
+# Face detection using OpenCV. The int8 ResNet-10 SSD face detector runs one
+# 300x300 forward pass and is used when its files are in FACE_MODEL_DIR; an
+# LBP (or, failing that, Haar) cascade is the fallback. cv2.dnn.Net is not re-entrant, hence the lock.
+FACE_MODEL_DIR = Path(os.environ.get('FACE_MODEL_DIR', Path(__file__).parent / 'models'))
+FACE_CONFIDENCE = 0.5
+_face_net = None
+_face_net_lock = threading.Lock()
 _face_cascade = None
+
+def get_face_net():
+    global _face_net
+    if _face_net is None:
+        model = FACE_MODEL_DIR / 'opencv_face_detector_uint8.pb'
+        config = FACE_MODEL_DIR / 'opencv_face_detector.pbtxt'
+        if model.exists() and config.exists():
+            net = cv2.dnn.readNetFromTensorflow(str(model), str(config))
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            _face_net = net
+            logger.info("✅ DNN face detector loaded")
+        else:
+            _face_net = False
+            logger.info("ℹ️ DNN face detector not found, using Haar cascade")
+    return _face_net or None
+
 def get_face_detector():
     global _face_cascade
     if _face_cascade is None:
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        # LBP features are integer compares, ~2-3x cheaper than Haar; the pip
+        # wheels only ship Haar cascades, so the LBP file comes from FACE_MODEL_DIR
+        lbp_path = FACE_MODEL_DIR / 'lbpcascade_frontalface_improved.xml'
+        if lbp_path.exists():
+            cascade_path = str(lbp_path)
+        else:
+            cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         _face_cascade = cv2.CascadeClassifier(cascade_path)
     return _face_cascade
 
+# Detection cost grows with pixel count, so faces are searched on a copy whose
+# longest side is at most this many pixels and the box is scaled back up
+DETECT_MAX_SIDE = 640
+
 def detect_face(image):
     """Detect face in image and return bounding box"""
-    img_array = np.array(image)
+    img_array = np.asarray(image)
+    ih, iw = img_array.shape[:2]
+    scale = min(1.0, DETECT_MAX_SIDE / max(iw, ih))
+    if scale < 1.0:
+        img_array = cv2.resize(img_array, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
     if len(img_array.shape) == 3 and img_array.shape[2] == 4:
         img_array = cv2.cvtColor(img_array, cv2.COLOR_RGBA2BGR)
     elif len(img_array.shape) == 3:
         img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-    gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
-    face_cascade = get_face_detector()
-    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-    if len(faces) == 0:
+    else:
+        img_array = cv2.cvtColor(img_array, cv2.COLOR_GRAY2BGR)
+    net = get_face_net()
+    if net is not None:
+        face = _detect_face_dnn(net, img_array)
+    else:
+        gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
+        face_cascade = get_face_detector()
+        # Passport uploads are a single centered face, so a coarser pyramid is enough
+        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5, minSize=(30, 30))
+        if len(faces) == 0:
+            return None
+        # Return largest face, as plain ints so the crop math below runs on
+        # native Python ints rather than boxed NumPy scalars
+        areas = faces[:, 2].astype(np.int64) * faces[:, 3]
+        face = tuple(map(int, faces[int(np.argmax(areas))]))
+    if face is None or scale == 1.0:
+        return face
+    return tuple(int(round(v / scale)) for v in face)
+
+def _detect_face_dnn(net, bgr):
+    """Most confident SSD detection as (x, y, w, h) in image pixels"""
+    ih, iw = bgr.shape[:2]
+    blob = cv2.dnn.blobFromImage(bgr, 1.0, (300, 300), (104, 117, 123), False, False)
+    with _face_net_lock:
+        net.setInput(blob)
+        dets = net.forward()[0, 0]
+    best = dets[dets[:, 2].argmax()] if len(dets) else None
+    if best is None or best[2] < FACE_CONFIDENCE:
+        return None
+    x1, y1 = max(0, int(best[3] * iw)), max(0, int(best[4] * ih))
+    x2, y2 = min(iw, int(best[5] * iw)), min(ih, int(best[6] * ih))
+    if x2 <= x1 or y2 <= y1:
         return None
-    # Return largest face
-    largest = max(faces, key=lambda f: f[2] * f[3])
-    return tuple(largest)
+    return (x1, y1, x2 - x1, y2 - y1)
+
+@dataclass(frozen=True, slots=True)
+class PhotoSpec:
+    size: tuple
+    head_ratio: float
+    eye_offset: float
+    head_margin: float
+    chin_margin: float
+    name: str
 
 # Country-specific photo specifications
 PHOTO_SPECS = {
@@ -93,6 +685,48 @@ PHOTO_SPECS = {
     'linkedin': {'size': (400, 400), 'head_ratio': 0.55, 'eye_offset': 0.35, 'head_margin': 0.15, 'chin_margin': 0.10, 'name': 'LinkedIn (400×400px)'},
     'square_1000': {'size': (1000, 1000), 'head_ratio': 0.50, 'eye_offset': 0.35, 'head_margin': 0.15, 'chin_margin': 0.10, 'name': 'Square HD (1000×1000px)'},
 }
+# Frozen slotted records: attribute reads instead of string-keyed lookups per request
+PHOTO_SPECS = {key: PhotoSpec(**spec) for key, spec in PHOTO_SPECS.items()}
+
+def get_spec(standard):
+    """Spec for a size key or bare country code, defaulting to US passport"""
+    return PHOTO_SPECS.get(standard) or PHOTO_SPECS.get('passport_' + standard) or PHOTO_SPECS['passport_us']
+
+PREVIEW_SIZE = (800, 800)
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+
+# OpenCV can decode JPEGs straight to 1/2, 1/4 or 1/8 scale
+_REDUCED_READS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+def make_preview(path, size):
+    """Build the JPEG editor preview with OpenCV; the canvas is at most 400px wide"""
+    longest = max(size)
+    flags = cv2.IMREAD_COLOR
+    for factor, reduced in _REDUCED_READS:
+        if longest // factor >= max(PREVIEW_SIZE):
+            flags = reduced
+            break
+    # Match PIL, which does not apply EXIF orientation either
+    arr = cv2.imread(str(path), flags | cv2.IMREAD_IGNORE_ORIENTATION)
+    if arr is None:
+        raise ValueError('Could not decode image')
+    scale = min(PREVIEW_SIZE[0] / arr.shape[1], PREVIEW_SIZE[1] / arr.shape[0])
+    if scale < 1:
+        arr = cv2.resize(arr, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode('.jpg', arr, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    if not ok:
+        raise ValueError('Could not encode preview')
+    return buf.tobytes()
+
+_MAGIC = [(b'\xff\xd8\xff', 'jpeg'), (b'\x89PNG\r\n\x1a\n', 'png'), (b'BM', 'bmp')]
+def sniff_format(head):
+    """Identify an allowed image format from its first bytes"""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    return None
 
 def auto_crop_passport(image, target_size, standard='us'):
     """Auto-crop image to passport standards based on face detection"""
@@ -105,11 +739,11 @@ def auto_crop_passport(image, target_size, standard='us'):
     tw, th = target_size
     
     # Get specs for this standard
-    spec = PHOTO_SPECS.get(standard, PHOTO_SPECS.get('passport_' + standard, PHOTO_SPECS['passport_us']))
-    head_ratio = spec['head_ratio']
-    eye_offset_ratio = spec['eye_offset']
-    head_top_margin = spec['head_margin']
-    chin_margin = spec['chin_margin']
+    spec = get_spec(standard)
+    head_ratio = spec.head_ratio
+    eye_offset_ratio = spec.eye_offset
+    head_top_margin = spec.head_margin
+    chin_margin = spec.chin_margin
     
     # Estimate head dimensions
     head_top = fy - int(fh * head_top_margin)
@@ -138,33 +772,139 @@ def auto_crop_passport(image, target_size, standard='us'):
     if crop_top + frame_height > ih:
         frame_height = ih - crop_top
     
-    # Crop and resize
-    cropped = image.crop((crop_left, crop_top, crop_left + frame_width, crop_top + frame_height))
-    return cropped.resize(target_size, Image.Resampling.LANCZOS)
+    # Resample the frame straight out of the source image
+    return lanczos_resize(image, target_size, box=(crop_left, crop_top, crop_left + frame_width, crop_top + frame_height))
+
+_STYLE_RE = re.compile(r'(<style>)(.*?)(</style>)', re.S)
+
+def minify_css(css):
+    """Strip comments, whitespace around CSS punctuation and leading zeros"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r'(?<=[\s:,(])0\.(?=\d)', '.', css)
+    return re.sub(r'\s+', ' ', css).replace(';}', '}').strip()
+
+# Sent with every page so a CDN/proxy can turn it into 103 Early Hints
+_PRELOAD_LINK = '</static/fonts/InterVariable.woff2>; rel=preload; as=font; type="font/woff2"; crossorigin'
+
+# The font is fetched by the Docker build; other deploys (Procfile, a bare
+# checkout) fall back to the Google Fonts stylesheet instead of a 404
+_FONT_SELF_HOSTED = (Path(__file__).parent / 'static' / 'fonts' / 'InterVariable.woff2').exists()
+_FONT_PRELOAD = '<link rel="preload" href="/static/fonts/InterVariable.woff2" as="font" type="font/woff2" crossorigin>'
+_FONT_FACE = "@font-face{font-family:Inter;font-style:normal;font-weight:400 700;font-display:swap;src:url(/static/fonts/InterVariable.woff2) format('woff2')}"
+_GOOGLE_FONTS = '''<link rel="preconnect" href="https://fonts.googleapis.com"><link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+<link rel="preload" as="style" href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" onload="this.onload=null;this.rel='stylesheet'">
+<noscript><link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap"></noscript>'''
+if not _FONT_SELF_HOSTED:
+    logger.warning("⚠️ static/fonts/InterVariable.woff2 not found, loading Inter from Google Fonts")
+
+def precompile_page(html, max_age=3600):
+    """Minify, then encode a static page once with brotli/gzip variants and a strong ETag"""
+    if not _FONT_SELF_HOSTED:
+        html = html.replace(_FONT_FACE, '').replace(_FONT_PRELOAD, _GOOGLE_FONTS)
+    html = _STYLE_RE.sub(lambda m: m[1] + minify_css(m[2]) + m[3], html)
+    body = html.encode('utf-8')
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    variants = {None: body, 'gzip': gzip.compress(body, 9)}
+    if BROTLI_AVAILABLE:
+        variants['br'] = brotli.compress(body, quality=11)
+    # Headers are fixed per variant, so build them here rather than per request.
+    # The page is built at import, so that is its Last-Modified time.
+    page, last_modified = {}, http_date()
+    for enc, data in variants.items():
+        headers = {'Content-Type': 'text/html; charset=utf-8', 'Cache-Control': f'public, max-age={max_age}',
+                   'Vary': 'Accept-Encoding', 'ETag': f'"{etag}-{enc}"' if enc else f'"{etag}"',
+                   'Last-Modified': last_modified}
+        if _FONT_SELF_HOSTED:
+            headers['Link'] = _PRELOAD_LINK
+        if enc:
+            headers['Content-Encoding'] = enc
+        page[enc] = data, headers
+    return page
+
+@functools.lru_cache(maxsize=64)
+def accepted_encodings(accept):
+    """Precompiled encodings an Accept-Encoding value allows, brotli first"""
+    # Browsers send a handful of distinct header values, so each is parsed once
+    allowed, refused = set(), set()
+    for part in accept.lower().split(','):
+        name, _, params = part.partition(';')
+        refuse = params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+        (refused if refuse else allowed).add(name.strip())
+    return tuple(enc for enc in ('br', 'gzip') if enc in allowed or ('*' in allowed and enc not in refused))
+
+def page_response(page):
+    """Serve a precompiled page, brotli or gzip when accepted, 304 on ETag match"""
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    enc = next((enc for enc in accepted if enc in page), None)
+    body, headers = page[enc]
+    # body is already bytes; direct_passthrough hands it to the server without
+    # Werkzeug's per-chunk encoding iterator
+    return Response(body, headers=headers, direct_passthrough=True).make_conditional(request)
+
+class StaticPageShortcut:
+    """WSGI middleware that answers GET/HEAD for precompiled pages before Flask dispatch"""
+    def __init__(self, app, pages):
+        self.app = app
+        # path -> encoding -> (body, ETag, Last-Modified, 200 headers, 304 headers), all built once
+        self.pages = {path: {enc: (body, headers['ETag'].strip('"'), headers['Last-Modified'],
+                                   list(headers.items()) + [('Content-Length', str(len(body)))],
+                                   [(k, v) for k, v in headers.items() if k not in ('Content-Type', 'Content-Encoding')])
+                             for enc, (body, headers) in page.items()}
+                      for path, page in pages.items()}
+
+    def __call__(self, environ, start_response):
+        page = self.pages.get(environ.get('PATH_INFO'))
+        method = environ.get('REQUEST_METHOD')
+        if page is None or method not in ('GET', 'HEAD'):
+            return self.app(environ, start_response)
+        accepted = accepted_encodings(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        body, etag, last_modified, headers, not_modified = page[next((enc for enc in accepted if enc in page), None)]
+        # Same If-None-Match / If-Modified-Since check make_conditional runs in page_response
+        if not is_resource_modified(environ, etag=etag, last_modified=last_modified):
+            start_response('304 Not Modified', not_modified)
+            return []
+        start_response('200 OK', headers)
+        return [] if method == 'HEAD' else [body]
 
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    return page_response(_INDEX_PAGE)
+
+_LEGAL_ANCHORS = {'about': 'about', 'contact': 'contact', 'privacy-policy': 'privacy', 'terms-of-service': 'terms'}
+
+@app.route('/legal')
+def legal():
+    return page_response(_LEGAL_PAGE)
 
-@app.route('/privacy-policy')
-def privacy_policy():
-    return render_template_string(PRIVACY_TEMPLATE)
+@app.route('/<any(about, contact, "privacy-policy", "terms-of-service"):page>')
+def info_page(page):
+    return redirect(f'/legal#{_LEGAL_ANCHORS[page]}', 301)
 
-@app.route('/terms-of-service')
-def terms_of_service():
-    return render_template_string(TERMS_TEMPLATE)
+# Shared by every page; one cached request instead of a data URI in each HTML body
+_FAVICON_SVG = b"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'><rect width='32' height='32' rx='6' fill='#6366f1'/><rect x='6' y='8' width='20' height='16' rx='2' fill='#fff'/><circle cx='16' cy='16' r='5' fill='#6366f1'/><circle cx='16' cy='16' r='3' fill='#818cf8'/><rect x='20' y='10' width='4' height='2' rx='1' fill='#6366f1'/></svg>"
 
-@app.route('/about')
-def about():
-    return render_template_string(ABOUT_TEMPLATE)
+@app.route('/favicon.svg')
+def favicon():
+    resp = Response(_FAVICON_SVG, mimetype='image/svg+xml')
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 31536000
+    resp.cache_control.immutable = True
+    return resp
 
-@app.route('/contact')
-def contact():
-    return render_template_string(CONTACT_TEMPLATE)
+@app.route('/static/theme.js')
+def theme_js():
+    return send_from_directory('static', 'theme.js', max_age=86400)
+
+@app.route('/static/fonts/<path:filename>')
+def serve_font(filename):
+    resp = send_from_directory('static/fonts', filename, max_age=31536000)
+    resp.cache_control.immutable = True
+    return resp
 
 @app.route('/static/images/<path:filename>')
 def serve_image(filename):
-    return send_from_directory('static/images', filename)
+    return send_from_directory('static/images', filename, max_age=86400)
 
 @app.route('/upload', methods=['POST'])
 def upload_image():
@@ -174,23 +914,41 @@ def upload_image():
         file = request.files['image']
         if file.filename == '':
             return jsonify({'error': 'No file'}), 400
-        allowed = {'.jpg', '.jpeg', '.png', '.webp', '.bmp'}
-        ext = Path(file.filename).suffix.lower()
-        if ext not in allowed:
+        # Sniff the format from the magic bytes instead of trusting the extension
+        if sniff_format(file.stream.read(32)) is None:
             return jsonify({'error': 'Invalid format'}), 400
-        data = file.read()
-        if len(data) > 50 * 1024 * 1024:
+        file.stream.seek(0)
+        session_id = secrets.token_urlsafe(16)
+        if save_blob_upload(session_id, 'original', file.stream, MAX_UPLOAD_SIZE) is None:
+            shutil.rmtree(SESSION_DIR / session_id, ignore_errors=True)
             return jsonify({'error': 'File too large'}), 400
-        session_id = str(uuid.uuid4())
-        temp_images[session_id] = {'original': data, 'filename': file.filename, 'size_choice': None, 'crop_settings': None, 'processed': None}
-        img = Image.open(io.BytesIO(data))
-        w, h = img.size
-        preview = base64.b64encode(data).decode('utf-8')
+        original = blob_path(session_id, 'original')
+        try:
+            # PIL only parses the header here; the pixels are decoded by OpenCV
+            with Image.open(original) as img:
+                w, h = img.size
+            preview = make_preview(original, (w, h))
+        except (OSError, ValueError):
+            # Valid magic bytes but truncated or corrupt; no session owns the
+            # spooled original yet, so drop it now rather than at the next sweep
+            shutil.rmtree(SESSION_DIR / session_id, ignore_errors=True)
+            return jsonify({'error': 'Invalid image'}), 400
+        try:
+            preview_etag = save_blob(session_id, 'preview', preview)
+            add_session(session_id, {'filename': file.filename, 'size_choice': None, 'crop_settings': None, 'processed_mimetype': None,
+                                     'etags': {'preview': preview_etag}})
+        except Exception:
+            shutil.rmtree(SESSION_DIR / session_id, ignore_errors=True)
+            raise
         logger.info(f"✅ Uploaded: {w}x{h}, session: {session_id}")
-        return jsonify({'success': True, 'session_id': session_id, 'width': w, 'height': h, 'preview': f'data:image/{ext[1:]};base64,{preview}'})
+        return jsonify({'success': True, 'session_id': session_id, 'width': w, 'height': h, 'preview': f'/preview/{session_id}'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.errorhandler(413)
+def too_large(e):
+    return jsonify({'error': 'File too large'}), 413
+
 @app.route('/set-size', methods=['POST'])
 def set_size():
     data = request.get_json()
@@ -220,11 +978,11 @@ def remove_background():
         if not sid or sid not in temp_images:
             return jsonify({'error': 'Invalid session'}), 400
         session = temp_images[sid]
-        image = Image.open(io.BytesIO(session['original']))
+        image = load_original(sid)
         size_choice = session.get('size_choice', {})
         size_type = size_choice.get('type', 'original')
-        sizes = {'passport_us': (600,600), 'passport_eu': (413,531), 'linkedin': (400,400), 'square_1000': (1000,1000)}
-        target = sizes.get(size_type)
+        # Same table the page's SIZES map is built from, so both crop paths agree
+        target = PHOTO_SPECS[size_type].size if size_type in PHOTO_SPECS else None
         if size_type == 'custom':
             target = (int(size_choice.get('custom_width', 400)), int(size_choice.get('custom_height', 400)))
         crop = session.get('crop_settings')
@@ -234,31 +992,36 @@ def remove_background():
             image = resize_crop(image, target)
         if image.mode != 'RGB':
             image = image.convert('RGB')
-        model = get_model()
-        result = model.process(image, type='rgba')
-        if bg_color:
-            c = bg_color.lstrip('#')
-            bg = Image.new('RGB', result.size, (int(c[0:2],16), int(c[2:4],16), int(c[4:6],16)))
-            bg.paste(result, (0,0), result)
-            result = bg
-        # Ensure RGBA mode for proper PNG compatibility with macOS Finder
-        if result.mode != 'RGBA':
-            result = result.convert('RGBA')
-        out = io.BytesIO()
-        result.save(out, format='PNG', optimize=False)
-        out.seek(0)
-        session['processed'] = out.getvalue()
-        b64 = base64.b64encode(out.getvalue()).decode('utf-8')
-        return jsonify({'success': True, 'image': f'data:image/png;base64,{b64}', 'width': result.width, 'height': result.height})
+        result = segment(image)
+        # Opaque backgrounds are saved as RGB PNG straight from the composite;
+        # only the transparent path keeps the RGBA cut-out
+        if bg_color and bg_color != 'transparent':
+            result = composite_on_color(result, parse_hex_color(bg_color))
+        save_blob(sid, 'processed', encode_png(result), processed_mimetype='image/png')
+        return jsonify({'success': True, 'image': f'/result/{sid}?v={secrets.token_hex(4)}', 'width': result.width, 'height': result.height})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/preview/<session_id>')
+def preview(session_id):
+    """Serve the downscaled upload preview for the editor"""
+    if session_id not in temp_images:
+        return jsonify({'error': 'Not found'}), 404
+    return send_blob(session_id, 'preview', 'image/jpeg')
+
+@app.route('/result/<session_id>')
+def result_image(session_id):
+    """Serve the latest processed image inline for the result preview"""
+    if session_id not in temp_images or not temp_images[session_id].get('processed_mimetype'):
+        return jsonify({'error': 'Not found'}), 404
+    return send_blob(session_id, 'processed', temp_images[session_id]['processed_mimetype'])
+
 @app.route('/download/<session_id>')
 def download(session_id):
-    if session_id not in temp_images or not temp_images[session_id].get('processed'):
+    if session_id not in temp_images or not temp_images[session_id].get('processed_mimetype'):
         return jsonify({'error': 'Not found'}), 400
     s = temp_images[session_id]
-    return send_file(io.BytesIO(s['processed']), mimetype='image/png', as_attachment=True, download_name=f"{Path(s['filename']).stem}_no_bg.png")
+    return send_blob(session_id, 'processed', 'image/png', as_attachment=True, download_name=f"{Path(s['filename']).stem}_no_bg.png")
 
 @app.route('/download-cropped', methods=['POST'])
 def download_cropped():
@@ -269,11 +1032,11 @@ def download_cropped():
         if not sid or sid not in temp_images:
             return jsonify({'error': 'Invalid session'}), 400
         session = temp_images[sid]
-        image = Image.open(io.BytesIO(session['original']))
+        image = load_original(sid)
         size_choice = session.get('size_choice', {})
         size_type = size_choice.get('type', 'original')
-        sizes = {'passport_us': (600,600), 'passport_eu': (413,531), 'linkedin': (400,400), 'square_1000': (1000,1000)}
-        target = sizes.get(size_type)
+        # Same table the page's SIZES map is built from, so both crop paths agree
+        target = PHOTO_SPECS[size_type].size if size_type in PHOTO_SPECS else None
         if size_type == 'custom':
             target = (int(size_choice.get('custom_width', 400)), int(size_choice.get('custom_height', 400)))
         crop = session.get('crop_settings')
@@ -281,24 +1044,19 @@ def download_cropped():
             image = apply_crop(image, crop, target)
         elif target:
             image = resize_crop(image, target)
-        if image.mode == 'RGBA':
-            image = image.convert('RGB')
-        out = io.BytesIO()
-        image.save(out, format='JPEG', quality=95)
-        out.seek(0)
-        session['processed'] = out.getvalue()
-        b64 = base64.b64encode(out.getvalue()).decode('utf-8')
-        return jsonify({'success': True, 'image': f'data:image/jpeg;base64,{b64}', 'width': image.width, 'height': image.height})
+        jpeg = encode_jpeg(image)
+        save_blob(sid, 'processed', jpeg, processed_mimetype='image/jpeg')
+        return jsonify({'success': True, 'image': f'/result/{sid}?v={secrets.token_hex(4)}', 'width': image.width, 'height': image.height})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/download-original/<session_id>')
 def download_original(session_id):
     """Download the cropped image without background removal"""
-    if session_id not in temp_images or not temp_images[session_id].get('processed'):
+    if session_id not in temp_images or not temp_images[session_id].get('processed_mimetype'):
         return jsonify({'error': 'Not found'}), 400
     s = temp_images[session_id]
-    return send_file(io.BytesIO(s['processed']), mimetype='image/jpeg', as_attachment=True, download_name=f"{Path(s['filename']).stem}_cropped.jpg")
+    return send_blob(session_id, 'processed', 'image/jpeg', as_attachment=True, download_name=f"{Path(s['filename']).stem}_cropped.jpg")
 
 @app.route('/auto-process', methods=['POST'])
 def auto_process():
@@ -314,42 +1072,26 @@ def auto_process():
             return jsonify({'error': 'Invalid session'}), 400
         session = temp_images[sid]
         session['size_type'] = size_type  # Store for photo sheet
-        image = Image.open(io.BytesIO(session['original']))
+        image = load_original(sid)
         # Determine target size and standard - use PHOTO_SPECS
         spec = PHOTO_SPECS.get(size_type, PHOTO_SPECS['passport_us'])
-        target = spec['size']
+        target = spec.size
         # Auto-crop based on face detection using the size_type as standard
         cropped = auto_crop_passport(image, target, size_type)
         if cropped.mode != 'RGB':
             cropped = cropped.convert('RGB')
         # Remove background
-        model = get_model()
-        result = model.process(cropped, type='rgba')
+        result = segment(cropped)
         if bg_color and bg_color != 'transparent':
-            c = bg_color.lstrip('#')
-            bg = Image.new('RGB', result.size, (int(c[0:2],16), int(c[2:4],16), int(c[4:6],16)))
-            bg.paste(result, (0,0), result)
-            result = bg
-        if result.mode != 'RGBA':
-            result = result.convert('RGBA')
-        out = io.BytesIO()
-        result.save(out, format='PNG', optimize=False)
-        out.seek(0)
-        session['processed'] = out.getvalue()
+            result = composite_on_color(result, parse_hex_color(bg_color))
+        # The print sheet is always on white; reuse the in-memory result for it
+        sheet_photo = result if result.mode == 'RGB' else composite_on_color(result, (255, 255, 255))
+        save_blob(sid, 'processed', encode_png(result), processed_mimetype='image/png')
         # Also create photo sheet
-        result_for_sheet = Image.open(io.BytesIO(session['processed']))
-        if result_for_sheet.mode == 'RGBA':
-            bg_sheet = Image.new('RGB', result_for_sheet.size, (255, 255, 255))
-            bg_sheet.paste(result_for_sheet, (0, 0), result_for_sheet)
-            result_for_sheet = bg_sheet
-        sheet, count = create_photo_sheet(result_for_sheet, size_type)
-        sheet_out = io.BytesIO()
-        sheet.save(sheet_out, format='JPEG', quality=95)
-        sheet_out.seek(0)
-        session['photo_sheet'] = sheet_out.getvalue()
-        session['sheet_count'] = count
-        b64 = base64.b64encode(session['processed']).decode('utf-8')
-        return jsonify({'success': True, 'image': f'data:image/png;base64,{b64}', 'width': result.width, 'height': result.height, 'sheet_count': count})
+        sheet, count = create_photo_sheet(sheet_photo, size_type)
+        # Printed sheets keep full chroma so skin tones and cut lines stay crisp
+        save_blob(sid, 'photo_sheet', encode_jpeg(sheet, full_chroma=True), sheet_count=count)
+        return jsonify({'success': True, 'image': f'/result/{sid}?v={secrets.token_hex(4)}', 'width': result.width, 'height': result.height, 'sheet_count': count})
     except Exception as e:
         logger.error(f"Auto-process error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -357,10 +1099,60 @@ def auto_process():
 @app.route('/download-sheet/<session_id>')
 def download_sheet(session_id):
     """Download the 4x6 photo print sheet"""
-    if session_id not in temp_images or not temp_images[session_id].get('photo_sheet'):
+    if session_id not in temp_images or not temp_images[session_id].get('sheet_count'):
         return jsonify({'error': 'Not found'}), 400
     s = temp_images[session_id]
-    return send_file(io.BytesIO(s['photo_sheet']), mimetype='image/jpeg', as_attachment=True, download_name=f"{Path(s['filename']).stem}_4x6_sheet.jpg")
+    return send_blob(session_id, 'photo_sheet', 'image/jpeg', as_attachment=True, download_name=f"{Path(s['filename']).stem}_4x6_sheet.jpg")
+
+@functools.lru_cache(maxsize=16)
+def parse_hex_color(color):
+    """'#rrggbb' -> (r, g, b); the UI only ever sends a handful of swatches"""
+    c = color.lstrip('#')
+    return (int(c[0:2],16), int(c[2:4],16), int(c[4:6],16))
+
+def composite_on_color(rgba, color):
+    """Flatten an RGBA image onto a solid color, one contiguous plane at a time"""
+    # split() yields planar bands, so each blend below is a unit-stride pass.
+    # The uint16 bands are fresh copies, so blending happens in place and one
+    # scratch plane is reused: no per-channel temporaries.
+    r, g, b, a = (np.asarray(band, dtype=np.uint16) for band in rgba.split())
+    inv = 255 - a
+    tmp = np.empty_like(a)
+    planes = []
+    for c, bg in zip((r, g, b), color):
+        c *= a
+        c += np.multiply(inv, bg, out=tmp)
+        planes.append(Image.fromarray(_div255(c), 'L'))
+    return Image.merge('RGB', planes)
+
+def _div255(v):
+    """round(v / 255) for uint16 v <= 255*255, using shifts instead of a divide"""
+    v += 128
+    v += v >> 8
+    v >>= 8
+    return v.astype(np.uint8)
+
+def encode_jpeg(img, quality=95, full_chroma=False):
+    """Encode an image as JPEG bytes, via libjpeg-turbo when available"""
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    if TURBOJPEG_AVAILABLE:
+        subsample = TJSAMP_444 if full_chroma else TJSAMP_420
+        return _turbojpeg.encode(np.asarray(img), quality=quality, pixel_format=TJPF_RGB, jpeg_subsample=subsample)
+    out = io.BytesIO()
+    img.save(out, format='JPEG', quality=quality, subsampling=0 if full_chroma else 2)
+    return out.getvalue()
+
+# zlib level 1: files grow ~10% but encode ~3x faster than the default 6
+PNG_COMPRESS_LEVEL = 1
+
+def encode_png(img):
+    """Encode an image as PNG bytes, via libspng when available"""
+    if SPNG_AVAILABLE and img.mode in ('RGB', 'RGBA', 'L'):
+        return pyspng.encode(np.asarray(img), compress_level=PNG_COMPRESS_LEVEL)
+    out = io.BytesIO()
+    img.save(out, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+    return out.getvalue()
 
 def apply_crop(img, crop, target):
     scale = crop.get('scale', 1.0)
@@ -371,16 +1163,20 @@ def apply_crop(img, crop, target):
     iw, ih = img.size
     if x+w > iw: w = iw - x
     if y+h > ih: h = ih - y
-    return img.crop((int(x), int(y), int(x+max(1,w)), int(y+max(1,h)))).resize(target, Image.Resampling.LANCZOS)
+    box = (int(x), int(y), int(x+max(1,w)), int(y+max(1,h)))
+    if box[2] <= iw and box[3] <= ih:
+        return lanczos_resize(img, target, box=box)
+    # Photo dragged off the canvas: crop() pads the part outside the image
+    return lanczos_resize(img.crop(box), target)
 
 def resize_crop(img, target):
     tw, th = target
     iw, ih = img.size
     s = max(tw/iw, th/ih)
-    nw, nh = int(iw*s), int(ih*s)
-    img = img.resize((nw, nh), Image.Resampling.LANCZOS)
-    l, t = (nw-tw)//2, (nh-th)//2
-    return img.crop((l, t, l+tw, t+th))
+    # Resample only the centered source window that survives the crop
+    sw, sh = tw/s, th/s
+    l, t = (iw-sw)/2, (ih-sh)/2
+    return lanczos_resize(img, target, box=(l, t, l+sw, t+sh))
 
 def create_photo_sheet(photo, size_type):
     """Create a 4x6 inch print sheet with multiple copies of the photo"""
@@ -390,7 +1186,7 @@ def create_photo_sheet(photo, size_type):
     # Get photo size from specs or use photo's actual size
     spec = PHOTO_SPECS.get(size_type)
     if spec:
-        pw, ph = spec['size']
+        pw, ph = spec.size
     else:
         pw, ph = photo.size
     
@@ -401,7 +1197,7 @@ def create_photo_sheet(photo, size_type):
     
     # Resize photo if needed
     if photo.size != (pw, ph):
-        photo = photo.resize((pw, ph), Image.Resampling.LANCZOS)
+        photo = lanczos_resize(photo, (pw, ph))
     
     # Calculate grid layout with small gaps for cutting guides
     gap = 4  # pixels between photos for cut lines
@@ -409,7 +1205,7 @@ def create_photo_sheet(photo, size_type):
     rows = (sheet_height + gap) // (ph + gap)
     
     # Create white sheet
-    sheet = Image.new('RGB', (sheet_width, sheet_height), (255, 255, 255))
+    sheet_arr = np.full((sheet_height, sheet_width, 3), 255, dtype=np.uint8)
     
     # Calculate starting position to center the grid
     total_w = cols * pw + (cols - 1) * gap
@@ -417,43 +1213,38 @@ def create_photo_sheet(photo, size_type):
     start_x = (sheet_width - total_w) // 2
     start_y = (sheet_height - total_h) // 2
     
-    # Paste photos in grid
-    for row in range(rows):
-        for col in range(cols):
-            x = start_x + col * (pw + gap)
-            y = start_y + row * (ph + gap)
-            sheet.paste(photo, (x, y))
+    # Tile one photo-plus-gap cell across the grid in a single copy, then drop
+    # the trailing gap on the right and bottom
+    cell = np.full((ph + gap, pw + gap, 3), 255, dtype=np.uint8)
+    cell[:ph, :pw] = np.asarray(photo if photo.mode == 'RGB' else photo.convert('RGB'))
+    grid = np.tile(cell, (rows, cols, 1))[:total_h, :total_w]
+    sheet_arr[start_y:start_y + total_h, start_x:start_x + total_w] = grid
     
-    # Draw cutting guide lines around each photo
-    from PIL import ImageDraw
-    draw = ImageDraw.Draw(sheet)
+    # Cutting guide lines around each photo are axis-aligned 1px strokes, so
+    # each one is a single row or column store into the array
     line_color = (180, 180, 180)  # Light gray
     
-    # Draw vertical lines (left and right of each column)
-    for col in range(cols + 1):
-        x = start_x + col * (pw + gap) - gap // 2
-        if col == 0:
-            x = start_x - 1
-        elif col == cols:
-            x = start_x + cols * pw + (cols - 1) * gap
-        draw.line([(x, 0), (x, sheet_height)], fill=line_color, width=1)
+    # Vertical lines (left and right of each column)
+    xs = [start_x + col * (pw + gap) - gap // 2 for col in range(cols + 1)]
+    xs[0], xs[-1] = start_x - 1, start_x + cols * pw + (cols - 1) * gap
+    for x in xs:
+        if 0 <= x < sheet_width:
+            sheet_arr[:, x] = line_color
     
-    # Draw horizontal lines (top and bottom of each row)
-    for row in range(rows + 1):
-        y = start_y + row * (ph + gap) - gap // 2
-        if row == 0:
-            y = start_y - 1
-        elif row == rows:
-            y = start_y + rows * ph + (rows - 1) * gap
-        draw.line([(0, y), (sheet_width, y)], fill=line_color, width=1)
+    # Horizontal lines (top and bottom of each row)
+    ys = [start_y + row * (ph + gap) - gap // 2 for row in range(rows + 1)]
+    ys[0], ys[-1] = start_y - 1, start_y + rows * ph + (rows - 1) * gap
+    for y in ys:
+        if 0 <= y < sheet_height:
+            sheet_arr[y, :] = line_color
     
-    return sheet, cols * rows
+    return Image.fromarray(sheet_arr, 'RGB'), cols * rows
 
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html lang="en" data-theme="light">
 <head>
 <meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
-<link rel="icon" type="image/svg+xml" href="data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'%3E%3Crect width='32' height='32' rx='6' fill='%236366f1'/%3E%3Crect x='6' y='8' width='20' height='16' rx='2' fill='%23fff'/%3E%3Ccircle cx='16' cy='16' r='5' fill='%236366f1'/%3E%3Ccircle cx='16' cy='16' r='3' fill='%23818cf8'/%3E%3Crect x='20' y='10' width='4' height='2' rx='1' fill='%236366f1'/%3E%3C/svg%3E">
+<link rel="icon" type="image/svg+xml" href="/favicon.svg">
 <title>Free Passport Photo Editor - Create Professional Photos Online</title>
 <meta name="description" content="Create professional passport and visa photos for free. Skip expensive CVS/Walgreens fees. AI-powered background removal, US &amp; EU passport sizes, instant download.">
 <meta name="keywords" content="passport photo, visa photo, free passport photo, passport photo maker, background removal, passport photo online, US passport photo, EU passport photo">
@@ -471,9 +1262,12 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
 <script type="application/ld+json">
 {"@context":"https://schema.org","@type":"WebApplication","name":"Passport Photo Editor","description":"Free online passport photo editor with AI background removal. Create US and EU passport photos, visa photos, and professional headshots instantly.","url":"https://passport-photo-app.blueforest-5a95b458.westus2.azurecontainerapps.io/","applicationCategory":"Photography","operatingSystem":"Web Browser","offers":{"@type":"Offer","price":"0","priceCurrency":"USD"},"featureList":["AI Background Removal","US Passport Photo (600x600)","EU Passport Photo (413x531)","Custom Sizes","Instant Download"]}
 </script>
-<link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&display=swap" rel="stylesheet">
+<script>document.documentElement.dataset.theme=matchMedia('(prefers-color-scheme:dark)').matches?'dark':'light'</script>
+<script src="/static/theme.js" defer></script>
+<link rel="preload" href="/static/fonts/InterVariable.woff2" as="font" type="font/woff2" crossorigin>
 <style>
-:root{--t:0.2s ease}
+@font-face{font-family:Inter;font-style:normal;font-weight:400 700;font-display:swap;src:url(/static/fonts/InterVariable.woff2) format('woff2')}
+:root{--t:0.2s ease;--g:linear-gradient(135deg,var(--ac),var(--ac2))}
 [data-theme="dark"]{--bg:#09090b;--bg2:#18181b;--bg3:#27272a;--tx:#fafafa;--tx2:#a1a1aa;--tx3:#71717a;--bd:#27272a;--ac:#6366f1;--ac2:#818cf8;--acbg:rgba(99,102,241,0.1);--ok:#22c55e;--okbg:rgba(34,197,94,0.1);--err:#ef4444;--sh:0 4px 12px rgba(0,0,0,0.4)}
 [data-theme="light"]{--bg:#fff;--bg2:#fafafa;--bg3:#f4f4f5;--tx:#18181b;--tx2:#52525b;--tx3:#a1a1aa;--bd:#e4e4e7;--ac:#6366f1;--ac2:#4f46e5;--acbg:rgba(99,102,241,0.08);--ok:#16a34a;--okbg:rgba(22,163,74,0.08);--err:#dc2626;--sh:0 4px 12px rgba(0,0,0,0.08)}
 *{margin:0;padding:0;box-sizing:border-box}
@@ -483,9 +1277,9 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .nav-logo{width:32px;height:32px;background:var(--ac);border-radius:8px;display:flex;align-items:center;justify-content:center;font-size:14px}
 .nav-brand{font-weight:600;font-size:0.95rem}
 .nav-right{display:flex;align-items:center;gap:20px}
-.nav-link{color:var(--tx2);text-decoration:none;font-size:0.85rem;font-weight:500;transition:color var(--t)}
+.nav-link{color:var(--tx2);text-decoration:none;font-size:0.85rem;font-weight:500}
 .nav-link:hover{color:var(--ac)}
-.nav-btn{display:inline-flex;align-items:center;gap:6px;padding:8px 14px;background:linear-gradient(135deg,#ec4899,#f472b6);color:#fff;text-decoration:none;border-radius:20px;font-size:0.8rem;font-weight:500;transition:all var(--t)}
+.nav-btn{display:inline-flex;align-items:center;gap:6px;padding:8px 14px;background:linear-gradient(135deg,#ec4899,#f472b6);color:#fff;text-decoration:none;border-radius:20px;font-size:0.8rem;font-weight:500;transition:transform var(--t),box-shadow var(--t)}
 .nav-btn:hover{transform:translateY(-1px);box-shadow:0 4px 12px rgba(236,72,153,0.3)}
 .app{max-width:720px;margin:0 auto;padding:48px 24px;flex:1;width:100%}
 .hdr{display:flex;justify-content:space-between;align-items:center;margin-bottom:40px}
@@ -494,12 +1288,12 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .hdr h1{font-size:1.25rem;font-weight:600}
 .hero{display:flex;align-items:center;justify-content:center;gap:48px;margin-bottom:32px;padding:0 16px}
 .hero-text{flex:1;max-width:400px}
-.hero h2{font-size:1.5rem;font-weight:700;margin-bottom:8px;background:linear-gradient(135deg,var(--ac),var(--ac2));-webkit-background-clip:text;-webkit-text-fill-color:transparent;background-clip:text}
+.hero h2{font-size:1.5rem;font-weight:700;margin-bottom:8px;background:var(--g);background-clip:text;color:transparent}
 .hero p{color:var(--tx2);font-size:0.95rem;margin:0 0 16px;line-height:1.6}
 .features{display:flex;gap:16px;flex-wrap:wrap;font-size:0.85rem;color:var(--ok);font-weight:500}
 .hero-demo{display:flex;gap:20px;flex-shrink:0}
-.demo-card{position:relative;border-radius:12px;overflow:hidden;box-shadow:var(--sh);background:var(--bg)}
-.demo-card img{width:140px;height:175px;object-fit:cover;display:block}
+.demo-card{position:relative;border-radius:12px;overflow:hidden;box-shadow:var(--sh);background:var(--bg);contain:layout paint}
+.demo-card img{width:140px;height:175px;object-fit:cover;display:block;contain:strict}
 .demo-after img{background:#fff}
 .demo-label{position:absolute;bottom:0;left:0;right:0;padding:8px;background:rgba(75,85,99,0.9);color:#fff;font-size:0.75rem;font-weight:700;text-align:center;letter-spacing:1px}
 .thm{width:44px;height:24px;background:var(--bg3);border-radius:12px;cursor:pointer;position:relative;border:1px solid var(--bd)}
@@ -511,25 +1305,25 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .size-dropdown:hover{border-color:var(--ac)}
 .size-dropdown:focus{outline:none;border-color:var(--ac)}
 .steps{display:flex;justify-content:center;gap:8px;margin-bottom:32px;flex-wrap:wrap}
-.step{display:flex;align-items:center;gap:6px;padding:8px 14px;background:var(--bg2);border:1px solid var(--bd);border-radius:20px;font-size:13px;font-weight:500;color:var(--tx3);transition:all var(--t)}
+.step{display:flex;align-items:center;gap:6px;padding:8px 14px;background:var(--bg2);border:1px solid var(--bd);border-radius:20px;font-size:13px;font-weight:500;color:var(--tx3);transition:background var(--t),border-color var(--t),color var(--t)}
 .step.active{background:var(--acbg);border-color:var(--ac);color:var(--ac)}
 .step.done{background:var(--okbg);border-color:var(--ok);color:var(--ok);cursor:pointer}
 .snum{width:20px;height:20px;border-radius:50%;background:var(--bg3);display:flex;align-items:center;justify-content:center;font-size:11px;font-weight:600}
 .step.active .snum{background:var(--ac);color:#fff}
 .step.done .snum{background:var(--ok);color:#fff}
 .card{background:var(--bg2);border:1px solid var(--bd);border-radius:16px;padding:32px;box-shadow:var(--sh)}
-.sec{display:none}.sec.active{display:block;animation:fade .3s ease}
+.sec{display:none}.sec.active{display:block;animation:fade .3s ease;contain:layout style}
 @keyframes fade{from{opacity:0;transform:translateY(8px)}to{opacity:1;transform:translateY(0)}}
-.auto-toggle{display:flex;align-items:center;gap:12px;padding:12px 16px;background:var(--bg);border:1px solid var(--bd);border-radius:12px;margin-bottom:16px;cursor:pointer;transition:all var(--t)}
+.auto-toggle{display:flex;align-items:center;gap:12px;padding:12px 16px;background:var(--bg);border:1px solid var(--bd);border-radius:12px;margin-bottom:16px;cursor:pointer;transition:background var(--t),border-color var(--t)}
 .auto-toggle:hover{border-color:var(--ac)}
 .auto-toggle.on{border-color:var(--ac);background:var(--acbg)}
 .auto-label{font-weight:600;font-size:0.9rem;color:var(--tx)}
-.auto-sw{width:44px;height:24px;background:var(--bg3);border-radius:12px;position:relative;border:1px solid var(--bd);transition:all var(--t)}
+.auto-sw{width:44px;height:24px;background:var(--bg3);border-radius:12px;position:relative;border:1px solid var(--bd);transition:background var(--t),border-color var(--t)}
 .auto-toggle.on .auto-sw{background:var(--ac);border-color:var(--ac)}
 .auto-dot{position:absolute;width:18px;height:18px;background:#fff;border-radius:50%;top:2px;left:2px;transition:transform var(--t)}
 .auto-toggle.on .auto-dot{transform:translateX(20px)}
 .auto-hint{color:var(--tx3);font-size:0.8rem}
-.upz{border:2px dashed var(--bd);border-radius:16px;padding:60px 32px;min-height:280px;display:flex;flex-direction:column;align-items:center;justify-content:center;text-align:center;cursor:pointer;background:var(--bg);transition:all 0.3s ease;position:relative;overflow:hidden}
+.upz{border:2px dashed var(--bd);border-radius:16px;padding:60px 32px;min-height:280px;display:flex;flex-direction:column;align-items:center;justify-content:center;text-align:center;cursor:pointer;background:var(--bg);transition:transform .3s ease,box-shadow .3s ease,border-color .3s ease;position:relative;overflow:hidden}
 .upz::before{content:'';position:absolute;inset:0;background:linear-gradient(135deg,var(--acbg) 0%,transparent 60%);opacity:0;transition:opacity 0.3s ease}
 .upz:hover,.upz.drag{border-color:var(--ac);background:var(--bg);transform:translateY(-2px);box-shadow:0 8px 30px rgba(99,102,241,0.15)}
 .upz:hover::before,.upz.drag::before{opacity:1}
@@ -540,11 +1334,11 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 #fi{display:none}
 .prev{margin-top:24px;text-align:center;display:none}.prev.vis{display:block}
 .prevc{position:relative;display:inline-block;border-radius:12px;overflow:hidden;box-shadow:var(--sh)}
-.prevc img{max-width:100%;max-height:300px;display:block}
+.prevc img{max-width:100%;max-height:300px;display:block;image-orientation:none}
 .badge{position:absolute;top:12px;right:12px;background:var(--ok);color:#fff;padding:4px 10px;border-radius:12px;font-size:12px;font-weight:500}
 .info{margin-top:12px;color:var(--tx3);font-size:0.8rem}
 .szg{display:grid;grid-template-columns:repeat(3,1fr);gap:10px;margin-bottom:24px}
-.szo{background:var(--bg);border:1px solid var(--bd);border-radius:10px;padding:16px 12px;cursor:pointer;text-align:center;transition:all var(--t)}
+.szo{background:var(--bg);border:1px solid var(--bd);border-radius:10px;padding:16px 12px;cursor:pointer;text-align:center;transition:transform var(--t),border-color var(--t),background var(--t)}
 .szo:hover{border-color:var(--ac);transform:translateY(-2px)}
 .szo.sel{border-color:var(--ac);background:var(--acbg)}
 .szi{font-size:24px;margin-bottom:8px}
@@ -557,20 +1351,20 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .cust span{color:var(--tx3)}
 .posed{text-align:center}
 .posed h3{margin-bottom:20px;font-size:1rem;font-weight:500}
-.cropc{display:inline-block;margin-bottom:16px;border-radius:12px;overflow:hidden;border:1px solid var(--bd);position:relative}
-.cropc canvas{display:block;cursor:grab}
+.cropc{display:inline-block;margin-bottom:16px;border-radius:12px;overflow:hidden;border:1px solid var(--bd);position:relative;contain:layout paint}
+.cropc canvas{display:block;cursor:grab;background:#1a1a1a;touch-action:none}
+.cropc .limg{position:absolute;top:0;left:0;max-width:none;transform-origin:0 0;will-change:transform;pointer-events:none;user-select:none}
 .cropc canvas:active{cursor:grabbing}
 .silhouette{position:absolute;top:0;left:0;width:100%;height:100%;pointer-events:none;display:none}
 .silhouette.vis{display:block}
-.silhouette svg{width:100%;height:100%}
 .zctrl{display:flex;align-items:center;justify-content:center;gap:12px;margin-bottom:16px;padding:12px 16px;background:var(--bg);border-radius:10px;border:1px solid var(--bd)}
-.zbtn{width:32px;height:32px;border:1px solid var(--bd);border-radius:8px;background:var(--bg2);color:var(--tx);font-size:1.1rem;font-weight:600;cursor:pointer;display:flex;align-items:center;justify-content:center;transition:all var(--t)}
+.zbtn{width:32px;height:32px;border:1px solid var(--bd);border-radius:8px;background:var(--bg2);color:var(--tx);font-size:1.1rem;font-weight:600;cursor:pointer;display:flex;align-items:center;justify-content:center;transition:border-color var(--t),background var(--t)}
 .zbtn:hover{border-color:var(--ac);background:var(--acbg)}
 .zslide{width:120px;height:4px;border-radius:2px;background:var(--bg3);appearance:none;cursor:pointer}
 .zslide::-webkit-slider-thumb{appearance:none;width:16px;height:16px;border-radius:50%;background:var(--ac);cursor:pointer}
 .zlbl{color:var(--tx3);font-size:0.8rem;min-width:50px}
 .pctrl{display:flex;gap:8px;justify-content:center;margin-bottom:20px}
-.pbtn{padding:8px 14px;border:1px solid var(--bd);border-radius:8px;background:var(--bg);color:var(--tx2);font-size:0.8rem;font-weight:500;cursor:pointer;transition:all var(--t)}
+.pbtn{padding:8px 14px;border:1px solid var(--bd);border-radius:8px;background:var(--bg);color:var(--tx2);font-size:0.8rem;font-weight:500;cursor:pointer;transition:border-color var(--t),color var(--t)}
 .pbtn:hover{border-color:var(--ac);color:var(--ac)}
 .guide-legend{display:none;justify-content:center;gap:16px;margin-bottom:12px;font-size:0.75rem;color:var(--tx2)}
 .guide-legend.vis{display:flex}
@@ -584,7 +1378,7 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .bgsel{margin-bottom:24px}
 .bgsel h4{font-size:0.875rem;margin-bottom:12px;color:var(--tx2);font-weight:500}
 .colors{display:flex;justify-content:center;gap:8px;flex-wrap:wrap}
-.col{width:40px;height:40px;border-radius:10px;cursor:pointer;border:2px solid transparent;transition:all var(--t);position:relative}
+.col{width:40px;height:40px;border-radius:10px;cursor:pointer;border:2px solid transparent;transition:transform var(--t),box-shadow var(--t),border-color var(--t);position:relative}
 .col:hover{transform:scale(1.08)}
 .col.sel{border-color:var(--ac);box-shadow:0 0 0 2px var(--acbg)}
 .col.sel::after{content:'✓';position:absolute;top:50%;left:50%;transform:translate(-50%,-50%);font-size:14px;color:#fff;text-shadow:0 1px 2px rgba(0,0,0,0.3)}
@@ -599,10 +1393,10 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .gen-status{margin-top:12px;color:var(--tx2);font-size:0.85rem;font-weight:500;text-align:center}
 .res{display:none;text-align:center}.res.vis{display:block;animation:fade .5s ease}
 .resok{color:var(--ok);font-weight:600;font-size:0.85rem;margin-bottom:24px;display:flex;align-items:center;justify-content:center;gap:6px}
-.resprev{display:inline-block;margin-bottom:28px;position:relative}
+.resprev{display:inline-block;margin-bottom:28px;position:relative;contain:layout}
 .resprev img{max-width:100%;max-height:350px;border-radius:16px;box-shadow:0 12px 40px rgba(0,0,0,0.12)}
 .imgframe{background:linear-gradient(145deg,var(--bg),var(--bg3));border-radius:20px;padding:16px;border:1px solid var(--bd)}
-.btn{display:inline-flex;align-items:center;justify-content:center;gap:8px;padding:12px 24px;border:none;border-radius:10px;font-size:0.9rem;font-weight:500;cursor:pointer;transition:all var(--t);font-family:inherit}
+.btn{display:inline-flex;align-items:center;justify-content:center;gap:8px;padding:12px 24px;border:none;border-radius:10px;font-size:0.9rem;font-weight:500;cursor:pointer;transition:transform var(--t),box-shadow var(--t),background var(--t);font-family:inherit}
 .btn-p{background:var(--ac);color:#fff}
 .btn-p:hover:not(:disabled){background:var(--ac2);transform:translateY(-1px);box-shadow:var(--sh)}
 .btn-ok{background:var(--ok);color:#fff}
@@ -618,7 +1412,7 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .footer a{color:var(--tx3);text-decoration:none}
 .about-section,.contact-section{padding:60px 24px;max-width:720px;margin:0 auto}
 .about-content,.contact-content{background:var(--bg2);border:1px solid var(--bd);border-radius:16px;padding:40px;box-shadow:var(--sh)}
-.about-section h2,.contact-section h2{font-size:1.5rem;font-weight:700;margin-bottom:24px;background:linear-gradient(135deg,var(--ac),var(--ac2));-webkit-background-clip:text;-webkit-text-fill-color:transparent;background-clip:text}
+.about-section h2,.contact-section h2{font-size:1.5rem;font-weight:700;margin-bottom:24px;background:var(--g);background-clip:text;color:transparent}
 .about-story h3{font-size:1.1rem;font-weight:600;margin-bottom:16px;color:var(--tx)}
 .about-story p{color:var(--tx2);line-height:1.8;margin-bottom:16px;font-size:0.95rem}
 .about-story strong{color:var(--tx);font-weight:600}
@@ -627,11 +1421,13 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .contact-content a{color:var(--ac);text-decoration:none}
 .contact-content a:hover{text-decoration:underline}
 .footer a:hover{color:var(--ac)}
-.how-it-works{margin-top:60px;padding:60px 32px;background:var(--bg);border-radius:0;border-top:1px solid var(--bd)}
+.how-it-works{margin-top:60px;padding:60px 32px;background:var(--bg);border-radius:0;border-top:1px solid var(--bd);content-visibility:auto;contain-intrinsic-size:auto 420px}
 .how-it-works h3{text-align:center;font-size:1.75rem;font-weight:700;margin-bottom:16px;color:var(--tx)}
 .how-it-works .hiw-sub{text-align:center;color:var(--tx3);font-size:0.95rem;margin-bottom:48px}
 .hiw-steps{display:flex;justify-content:center;align-items:flex-start;gap:0;position:relative;max-width:900px;margin:0 auto}
-.hiw-step{flex:1;text-align:center;position:relative;padding:0 16px;max-width:200px}
+.hiw-step{flex:1;text-align:center;position:relative;padding:0 16px;max-width:200px;transition:opacity .4s ease,transform .4s ease}
+.how-it-works:not(.in) .hiw-step{opacity:0;transform:translateY(12px)}
+@media(prefers-reduced-motion:reduce){.hiw-step{transition:none}}
 .hiw-num{width:48px;height:48px;border-radius:50%;background:var(--ac);color:#fff;display:flex;align-items:center;justify-content:center;font-size:1.1rem;font-weight:700;margin:0 auto 20px;position:relative;z-index:2;box-shadow:0 4px 12px rgba(99,102,241,0.25);transition:transform 0.2s ease,box-shadow 0.2s ease}
 .hiw-step:hover .hiw-num{transform:scale(1.1);box-shadow:0 6px 20px rgba(99,102,241,0.35)}
 .hiw-line{position:absolute;top:24px;left:calc(50% + 24px);right:calc(-50% + 24px);height:2px;background:linear-gradient(90deg,var(--ac),var(--bd));z-index:1}
@@ -645,10 +1441,10 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 <nav class="navbar">
 <div class="nav-left"><div class="nav-logo">📷</div><span class="nav-brand">Passport Photo Editor</span></div>
 <div class="nav-right">
-<a href="/about" class="nav-link">About</a>
-<a href="/contact" class="nav-link">Contact</a>
+<a href="/legal#about" class="nav-link">About</a>
+<a href="/legal#contact" class="nav-link">Contact</a>
 <a href="https://buymeacoffee.com/onestopshoppassportphotos" target="_blank" class="nav-btn">☕ Buy me a coffee</a>
-<div class="thm" onclick="toggleTheme()"></div>
+<div class="thm"></div>
 </div>
 </nav>
 <div class="app">
@@ -659,8 +1455,8 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 <div class="features"><span>✓ US & EU Passport Sizes</span><span>✓ AI Background Removal</span><span>✓ 100% Free</span></div>
 </div>
 <div class="hero-demo">
-<div class="demo-card demo-before"><img src="/static/images/before.jpg" alt="Before - Original photo"><span class="demo-label">BEFORE</span></div>
-<div class="demo-card demo-after"><img src="/static/images/after.jpg" alt="After - Passport photo"><span class="demo-label">AFTER</span></div>
+<div class="demo-card demo-before"><img src="/static/images/before.jpg" alt="Before - Original photo" width="140" height="175" loading="lazy" decoding="async"><span class="demo-label">BEFORE</span></div>
+<div class="demo-card demo-after"><img src="/static/images/after.jpg" alt="After - Passport photo" width="140" height="175" loading="lazy" decoding="async"><span class="demo-label">AFTER</span></div>
 </div>
 </div>
 <div class="steps">
@@ -709,20 +1505,8 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 </div>
 <div class="sec" id="sec2">
 <div class="posed"><h3>Adjust Position</h3>
-<div class="cropc"><canvas id="canvas"></canvas>
-<div class="silhouette" id="silhouette">
-<svg viewBox="0 0 100 100" preserveAspectRatio="none">
-<!-- Zone bands only - no text labels inside -->
-<!-- Head top zone (5-15% - where top of head should be) -->
-<rect x="0" y="5" width="100" height="10" fill="rgba(99,102,241,0.12)"/>
-<!-- Eye zone (31-44% from top) -->
-<rect x="0" y="31" width="100" height="13" fill="rgba(34,197,94,0.12)"/>
-<!-- Chin zone (65-75% from top) -->
-<rect x="0" y="65" width="100" height="10" fill="rgba(249,115,22,0.1)"/>
-<!-- Center vertical guide (nose alignment) -->
-<line x1="50" y1="0" x2="50" y2="100" stroke="rgba(236,72,153,0.35)" stroke-width="0.5" stroke-dasharray="3,3"/>
-</svg>
-</div>
+<div class="cropc"><canvas id="canvas"></canvas><img class="limg" id="limgEl" alt="">
+<canvas class="silhouette" id="silhouette"></canvas>
 </div>
 <div class="zctrl"><button class="zbtn" onclick="zout()">−</button><input type="range" class="zslide" id="zslide" min="0" max="100" value="100"><button class="zbtn" onclick="zin()">+</button><span class="zlbl" id="zlbl">100%</span></div>
 <div class="guide-legend" id="guideLegend"><span class="gl-item"><span class="gl-dot gl-purple"></span>Top of head</span><span class="gl-item"><span class="gl-dot gl-green"></span>Eyes</span><span class="gl-item"><span class="gl-dot gl-orange"></span>Chin</span><span class="gl-item"><span class="gl-dot gl-pink"></span>Center</span></div>
@@ -733,12 +1517,12 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 <div class="proc" id="proc">
 <div class="bgsel"><h4>Background color</h4>
 <div class="colors">
-<div class="col sel" data-c="#ffffff" style="background:#fff" onclick="selCol('#ffffff')"></div>
-<div class="col trans" data-c="transparent" onclick="selCol('transparent')"></div>
-<div class="col" data-c="#f0f0f0" style="background:#f0f0f0" onclick="selCol('#f0f0f0')"></div>
-<div class="col" data-c="#87CEEB" style="background:#87CEEB" onclick="selCol('#87CEEB')"></div>
-<div class="col" data-c="#90EE90" style="background:#90EE90" onclick="selCol('#90EE90')"></div>
-<div class="col" data-c="#FFB6C1" style="background:#FFB6C1" onclick="selCol('#FFB6C1')"></div>
+<div class="col sel" data-c="#ffffff" style="background:#fff"></div>
+<div class="col trans" data-c="transparent"></div>
+<div class="col" data-c="#f0f0f0" style="background:#f0f0f0"></div>
+<div class="col" data-c="#87CEEB" style="background:#87CEEB"></div>
+<div class="col" data-c="#90EE90" style="background:#90EE90"></div>
+<div class="col" data-c="#FFB6C1" style="background:#FFB6C1"></div>
 </div></div>
 <div class="btng"><button class="btn btn-s" onclick="go(S.manual?2:1)">← Back</button><button class="btn btn-p" id="skipbtn" onclick="skipAndDownload()">⬇️ Skip & Download</button><button class="btn btn-ok" id="procbtn" onclick="process()">🚀 Remove Background</button></div>
 <div class="progc" id="progc"><div class="progbg"><div class="prog" id="prog"></div></div><div class="progt" id="progt">Processing...</div></div>
@@ -761,37 +1545,47 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 </div>
 </div>
 </div>
-<footer class="footer">© 2026 Passport Photo Editor<span>·</span><a href="/privacy-policy">Privacy</a><span>·</span><a href="/terms-of-service">Terms</a><span>·</span>Made with ❤️</footer>
+<footer class="footer">© 2026 Passport Photo Editor<span>·</span><a href="/legal#privacy">Privacy</a><span>·</span><a href="/legal#terms">Terms</a><span>·</span>Made with ❤️</footer>
 <script>
-let S={step:1,sid:null,img:null,sz:'passport_us',col:'#ffffff',iw:0,ih:0,sc:1,ox:0,oy:0,tw:600,th:600,manual:false};
+const DEFAULT_STATE=()=>({step:1,sid:null,img:null,sz:'passport_us',col:'#ffffff',iw:0,ih:0,sc:1,ox:0,oy:0,tw:600,th:600,manual:false});
+let S=DEFAULT_STATE();
+// Element handles are looked up once; the script runs after the markup it uses
+const $=Object.fromEntries(['autoToggle','canvas','err','errtxt','guideLegend','pimg','pinfo','prev','proc','procbtn','prog','progc','progt','res','resimg','s1','s1btn','s2','s3','sec1','sec2','sec3','silhouette','skipbtn','szsel'].map(id=>[id,document.getElementById(id)]));
 
-function toggleAuto(){S.manual=!S.manual;document.getElementById('autoToggle').classList.toggle('on',S.manual);
-if(S.sid){document.getElementById('s1btn').textContent=S.manual?'Next →':'✨ Generate Photo'}}
+function toggleAuto(){S.manual=!S.manual;$.autoToggle.classList.toggle('on',S.manual);
+if(S.sid){$.s1btn.textContent=S.manual?'Next →':'✨ Generate Photo'}}
 
-function selSzDrop(sz){S.sz=sz;
-const szs={passport_us:[600,600],passport_eu:[413,531],passport_uk:[413,531],passport_canada:[591,827],passport_india:[600,600],passport_china:[390,567],passport_40x50:[472,591],passport_35x35:[413,413],passport_30x40:[354,472],visa_australia:[413,531],visa_japan:[413,531],visa_brazil:[591,827],visa_saudi:[472,709],visa_45x45:[531,531],visa_47x47:[555,555],visa_50x50:[591,591],linkedin:[400,400],square_1000:[1000,1000]};
-if(szs[sz]){S.tw=szs[sz][0];S.th=szs[sz][1]}else if(sz==='original'){S.tw=S.iw;S.th=S.ih}}
+// Output sizes per standard (filled in from PHOTO_SPECS); built once, not per selection
+const SIZES=new Map(__SIZES__);
+// Standards whose head/eye/chin guide applies
+const GUIDE_SIZES=new Set(['passport_us','passport_eu']);
+
+function selSzDrop(sz){S.sz=sz;const d=SIZES.get(sz);
+if(d){[S.tw,S.th]=d}else if(sz==='original'){S.tw=S.iw;S.th=S.ih}}
 
 async function processFromUpload(){
 if(!S.sid){err('Upload an image first');return}
 if(S.manual){go(2);return}
-hide();document.getElementById('s1btn').disabled=true;document.getElementById('s1btn').textContent='Generating...';
+hide();$.s1btn.disabled=true;$.s1btn.textContent='Generating...';
 const progc=document.createElement('div');progc.className='gen-prog vis';progc.innerHTML='<div class="gen-bar"><div class="gen-fill" id="gen-fill"></div></div><div class="gen-status" id="gen-status">Analyzing photo...</div>';
-document.getElementById('prev').appendChild(progc);
-setTimeout(()=>{document.getElementById('gen-fill').style.width='25%';document.getElementById('gen-status').textContent='Detecting face...'},300);
-setTimeout(()=>{document.getElementById('gen-fill').style.width='50%';document.getElementById('gen-status').textContent='Cropping to size...'},800);
+$.prev.appendChild(progc);
+// Bar and label are written together in one frame; one timer walks the staged messages
+const fill=progc.querySelector('.gen-fill'),status=progc.querySelector('.gen-status');
+const setGen=(p,m)=>requestAnimationFrame(()=>{fill.style.width=p+'%';status.textContent=m});
+const steps=[[25,'Detecting face...'],[50,'Cropping to size...']];let si=0;
+const iv=setInterval(()=>{if(si<steps.length)setGen(...steps[si++]);else clearInterval(iv)},400);
 const r=await fetch('/auto-process',{method:'POST',headers:{'Content-Type':'application/json'},
 body:JSON.stringify({session_id:S.sid,size:S.sz,background_color:S.col})});
-document.getElementById('gen-fill').style.width='85%';document.getElementById('gen-status').textContent='Removing background...';
-await new Promise(r=>setTimeout(r,400));document.getElementById('gen-fill').style.width='100%';document.getElementById('gen-status').textContent='Done!';
+clearInterval(iv);setGen(85,'Removing background...');
+await new Promise(r=>setTimeout(r,400));setGen(100,'Done!');
 const d=await r.json();
-if(d.success){document.getElementById('resimg').src=d.image;S.sheetCount=d.sheet_count;S.step=3;updSteps();
+if(d.success){$.resimg.src=d.image;S.sheetCount=d.sheet_count;S.step=3;updSteps();
 document.querySelectorAll('.sec').forEach(s=>s.classList.remove('active'));
-document.getElementById('sec3').classList.add('active');
-document.getElementById('proc').style.display='none';document.getElementById('res').classList.add('vis');
-document.getElementById('res').querySelector('.btng').innerHTML='<button class="btn btn-s" onclick="startOver()">Start Over</button><button class="btn btn-p" onclick="dl()">⬇️ Single Photo</button><button class="btn btn-ok" onclick="dlSheet()">🖨️ 4×6 Print Sheet ('+d.sheet_count+' photos)</button>'}
-else{err(d.error);document.getElementById('s1btn').disabled=false;document.getElementById('s1btn').textContent='✨ Generate Photo';progc.remove()}}
-let cv,ctx,limg,drag=false,dx,dy;
+$.sec3.classList.add('active');
+$.proc.style.display='none';$.res.classList.add('vis');
+$.res.querySelector('.btng').innerHTML='<button class="btn btn-s" onclick="startOver()">Start Over</button><button class="btn btn-p" onclick="dl()">⬇️ Single Photo</button><button class="btn btn-ok" onclick="dlSheet()">🖨️ 4×6 Print Sheet ('+d.sheet_count+' photos)</button>'}
+else{err(d.error);$.s1btn.disabled=false;$.s1btn.textContent='✨ Generate Photo';progc.remove()}}
+let cv,drag=false,dx,dy;
 const upz=document.getElementById('upz'),fi=document.getElementById('fi');
 upz.onclick=()=>fi.click();
 upz.ondragover=e=>{e.preventDefault();upz.classList.add('drag')};
@@ -799,140 +1593,232 @@ upz.ondragleave=()=>upz.classList.remove('drag');
 upz.ondrop=e=>{e.preventDefault();upz.classList.remove('drag');if(e.dataTransfer.files.length)upload(e.dataTransfer.files[0])};
 fi.onchange=e=>{if(e.target.files.length)upload(e.target.files[0])};
 
-function toggleTheme(){document.documentElement.dataset.theme=document.documentElement.dataset.theme==='dark'?'light':'dark'}
-
+// The upload preview shows the local file through a blob: URL, decoded while the
+// upload is in flight; EXIF orientation is ignored to match the server
+let purl=null,pfile=null,lurl=null;
+function dropPurl(){if(purl){URL.revokeObjectURL(purl);purl=null}if(lurl){URL.revokeObjectURL(lurl);lurl=null}}
+// Large photos are shrunk to UPLOAD_MAX px in the browser before upload: the
+// biggest output is 1000px, so the rest is upload time and server decode work
+const UPLOAD_MAX=2048;
+async function shrink(f){
+if(f.size<1.5e6||!window.OffscreenCanvas||!window.createImageBitmap)return f;
+try{const full=await createImageBitmap(f,{imageOrientation:'none'}),m=Math.max(full.width,full.height);
+if(m<=UPLOAD_MAX){full.close();return f}
+const k=UPLOAD_MAX/m,w=Math.round(full.width*k),h=Math.round(full.height*k);
+const off=new OffscreenCanvas(w,h),oc=off.getContext('2d');oc.imageSmoothingQuality='high';
+oc.drawImage(full,0,0,w,h);full.close();
+// Formats that can carry alpha stay PNG so transparency survives the shrink
+const png=/png|webp|gif|avif/.test(f.type),type=png?'image/png':'image/jpeg';
+const blob=await off.convertToBlob(png?{type}:{type,quality:0.9});
+return new File([blob],f.name.replace(/\\.[^.]*$/,'')+(png?'.png':'.jpg'),{type})}
+catch(e){return f}}
 async function upload(f){
 hide();if(f.size>50*1024*1024){err('File too large');return}
+f=await shrink(f);
+dropPurl();purl=URL.createObjectURL(f);pfile=f;$.pimg.src=purl;
 const fd=new FormData();fd.append('image',f);
 const r=await fetch('/upload',{method:'POST',body:fd});
 const d=await r.json();
-if(d.success){S.sid=d.session_id;S.img=d.preview;S.iw=d.width;S.ih=d.height;
-document.getElementById('pimg').src=d.preview;document.getElementById('pinfo').textContent=d.width+'×'+d.height+'px';
-upz.style.display='none';document.getElementById('prev').classList.add('vis');
-document.getElementById('s1btn').textContent=S.manual?'Next →':'✨ Generate Photo'}
-else err(d.error)}
+if(d.success){S.sid=d.session_id;S.img=d.preview;S.iw=d.width;S.ih=d.height;S.crop=null;
+$.pinfo.textContent=d.width+'×'+d.height+'px';
+upz.style.display='none';$.prev.classList.add('vis');
+$.s1btn.textContent=S.manual?'Next →':'✨ Generate Photo'}
+else{dropPurl();err(d.error)}}
 
-function reset(){upz.style.display='block';document.getElementById('prev').classList.remove('vis');fi.value='';S.sid=null}
+function reset(){upz.style.display='block';$.prev.classList.remove('vis');fi.value='';S.sid=null;dropPurl()}
 
 
-function selCol(c){S.col=c;document.querySelectorAll('.col').forEach(o=>o.classList.remove('sel'));
-document.querySelector('[data-c="'+c+'"]').classList.add('sel')}
+// One delegated listener for the palette; remembering the selected swatch
+// makes deselecting O(1) instead of re-querying every .col
+let selSw=document.querySelector('.col.sel');
+document.querySelector('.colors').addEventListener('click',e=>{const t=e.target.closest('.col');if(!t||t===selSw)return;
+S.col=t.dataset.c;selSw?.classList.remove('sel');t.classList.add('sel');selSw=t});
 
+// The photo is its own compositor layer moved with a CSS transform, so drag and
+// zoom never repaint pixels; the canvas only provides the frame and events
+const limgEl=document.getElementById('limgEl'),zslide=document.getElementById('zslide'),zlbl=document.getElementById('zlbl');
 function initCanvas(){
-cv=document.getElementById('canvas');ctx=cv.getContext('2d');
-limg=new Image();limg.onload=()=>resetPos();limg.src=S.img;
+cv=$.canvas;
 const mw=Math.min(400,window.innerWidth-80),r=S.tw/S.th;
-cv.width=mw;cv.height=mw/r;
+cv.width=mw;cv.height=mw/r;rect=null;
+if(limgEl.getAttribute('src')!==S.img)limgEl.src=S.img;
+if(limgEl.complete&&limgEl.naturalWidth)resetPos();else limgEl.onload=()=>resetPos();
 // Show silhouette guide for passport sizes only
-const sil=document.getElementById('silhouette');
-const leg=document.getElementById('guideLegend');
-if(['passport_us','passport_eu'].includes(S.sz)){sil.classList.add('vis');leg.classList.add('vis')}else{sil.classList.remove('vis');leg.classList.remove('vis')}
-cv.onmousedown=e=>startDrag(e);cv.onmousemove=e=>doDrag(e);cv.onmouseup=endDrag;cv.onmouseleave=endDrag;
-cv.ontouchstart=e=>{e.preventDefault();startDrag(e.touches[0])};cv.ontouchmove=e=>{e.preventDefault();doDrag(e.touches[0])};cv.ontouchend=endDrag;
-cv.onwheel=e=>{e.preventDefault();zoomBy(e.deltaY>0?-10:10)};
-document.getElementById('zslide').oninput=e=>{S.sc=e.target.value/100;draw();updZ()}}
+const sil=$.silhouette;
+const leg=$.guideLegend;
+if(GUIDE_SIZES.has(S.sz)){drawGuides(sil);sil.classList.add('vis');leg.classList.add('vis')}else{sil.classList.remove('vis');leg.classList.remove('vis')}
+zslide.oninput=e=>{S.sc=e.target.value/100;scheduleDraw(true)}}
+
+// Passport guide, painted once per editor open into a static overlay canvas:
+// head-top, eye and chin bands ([top, height, color] as fractions of the frame)
+// plus a dashed center line for nose alignment
+const GUIDE_BANDS=[[0.05,0.10,'rgba(99,102,241,0.12)'],[0.31,0.13,'rgba(34,197,94,0.12)'],[0.65,0.10,'rgba(249,115,22,0.1)']];
+function drawGuides(g){g.width=cv.width;g.height=cv.height;const x=g.getContext('2d'),w=g.width,h=g.height;
+for(const[t,bh,c]of GUIDE_BANDS){x.fillStyle=c;x.fillRect(0,h*t,w,h*bh)}
+x.strokeStyle='rgba(236,72,153,0.35)';x.lineWidth=Math.max(1,w*0.005);x.setLineDash([h*0.03,h*0.03]);
+x.beginPath();x.moveTo(w/2,0);x.lineTo(w/2,h);x.stroke()}
 
 function resetPos(){const sw=cv.width/S.iw,sh=cv.height/S.ih;S.sc=Math.max(sw,sh);
 S.ox=(cv.width-S.iw*S.sc)/2;S.oy=(cv.height-S.ih*S.sc)/2;
-document.getElementById('zslide').value=S.sc*100;updZ();draw()}
+zslide.value=S.sc*100;updZ();draw()}
 
-function center(){S.ox=(cv.width-S.iw*S.sc)/2;S.oy=(cv.height-S.ih*S.sc)/2;draw()}
+function center(){S.ox=(cv.width-S.iw*S.sc)/2;S.oy=(cv.height-S.ih*S.sc)/2;scheduleDraw()}
 function fit(){resetPos()}
-function startDrag(e){drag=true;dx=e.clientX-S.ox;dy=e.clientY-S.oy}
-function doDrag(e){if(!drag)return;S.ox=e.clientX-dx;S.oy=e.clientY-dy;draw()}
+// The canvas rect is read once per drag gesture (and dropped on resize), so
+// move events map client coordinates to canvas pixels without forcing layout
+let rect=null;
+window.addEventListener('resize',()=>{rect=null});
+function canvasPt(e){if(!rect)rect=cv.getBoundingClientRect();const k=cv.width/rect.width;return[(e.clientX-rect.left)*k,(e.clientY-rect.top)*k]}
+function startDrag(e){drag=true;rect=cv.getBoundingClientRect();const[x,y]=canvasPt(e);dx=x-S.ox;dy=y-S.oy}
+function doDrag(e){if(!drag)return;const[x,y]=canvasPt(e);S.ox=x-dx;S.oy=y-dy;scheduleDraw()}
 function endDrag(){drag=false}
+// Mouse, pen and touch share pointer events. touch-action:none stops touch
+// panning on the canvas, so only the wheel listener has to be non-passive, and
+// it only claims the wheel while the cursor is over the photo.
+function onWheel(e){rect=cv.getBoundingClientRect();const[x,y]=canvasPt(e);
+if(x<S.ox||y<S.oy||x>S.ox+S.iw*S.sc||y>S.oy+S.ih*S.sc)return;
+e.preventDefault();zoomBy(e.deltaY>0?-10:10)}
+$.canvas.addEventListener('pointerdown',e=>{$.canvas.setPointerCapture(e.pointerId);startDrag(e)});
+$.canvas.addEventListener('pointermove',doDrag,{passive:true});
+$.canvas.addEventListener('pointerup',endDrag);
+$.canvas.addEventListener('pointercancel',endDrag);
+$.canvas.addEventListener('wheel',onWheel,{passive:false});
 function zin(){zoomBy(1)}
 function zout(){zoomBy(-1)}
 function zoomBy(d){const os=S.sc;S.sc=Math.max(0.1,Math.min(2,S.sc+d/100));
 const cx=cv.width/2,cy=cv.height/2;S.ox=cx-(cx-S.ox)*(S.sc/os);S.oy=cy-(cy-S.oy)*(S.sc/os);
-document.getElementById('zslide').value=S.sc*100;updZ();draw()}
-function updZ(){document.getElementById('zlbl').textContent=Math.round(S.sc*100)+'%'}
-function draw(){ctx.fillStyle='#1a1a1a';ctx.fillRect(0,0,cv.width,cv.height);
-if(limg.complete)ctx.drawImage(limg,S.ox,S.oy,S.iw*S.sc,S.ih*S.sc)}
+zslide.value=S.sc*100;scheduleDraw(true)}
+function updZ(){zlbl.textContent=Math.round(S.sc*100)+'%'}
+// Input can fire faster than the display refreshes; coalesce to one paint (and
+// one zoom-label write when asked) per frame
+let rafPending=false,zPending=false;
+function scheduleDraw(z){zPending=zPending||!!z;if(rafPending)return;rafPending=true;
+requestAnimationFrame(()=>{rafPending=false;draw();if(zPending){zPending=false;updZ()}})}
+function draw(){if(!limgEl.naturalWidth)return;
+// S.sc is relative to the original upload; the layer holds the smaller preview
+const k=S.sc*S.iw/limgEl.naturalWidth;
+limgEl.style.transform=`translate(${S.ox}px,${S.oy}px) scale(${k})`}
 
 async function saveCrop(){
+S.crop={scale:S.sc,offsetX:S.ox,offsetY:S.oy,canvasW:cv.width,canvasH:cv.height};
 await fetch('/set-crop',{method:'POST',headers:{'Content-Type':'application/json'},
-body:JSON.stringify({session_id:S.sid,crop_settings:{scale:S.sc,offsetX:S.ox,offsetY:S.oy,canvasW:cv.width,canvasH:cv.height}})});
+body:JSON.stringify({session_id:S.sid,crop_settings:S.crop})});
 go(3)}
 
 async function process(){
-hide();document.getElementById('procbtn').disabled=true;
-document.getElementById('progc').classList.add('vis');
-const pb=document.getElementById('prog');let p=0;
-const iv=setInterval(()=>{p=Math.min(90,p+Math.random()*15);pb.style.width=p+'%'},500);
+hide();$.procbtn.disabled=true;
+$.progc.classList.add('vis');
+// Visual-only progress: a frame loop that eases towards 90% and pauses with the tab
+const pb=$.prog,start=performance.now();let alive=true;
+const tick=t=>{if(!alive)return;pb.style.width=Math.min(90,(t-start)/80)+'%';requestAnimationFrame(tick)};
+requestAnimationFrame(tick);
 await fetch('/set-size',{method:'POST',headers:{'Content-Type':'application/json'},
 body:JSON.stringify({session_id:S.sid,size:S.sz})});
-document.getElementById('progt').textContent='Removing background...';
+$.progt.textContent='Removing background...';
 const r=await fetch('/remove-background',{method:'POST',headers:{'Content-Type':'application/json'},
 body:JSON.stringify({session_id:S.sid,background_color:S.col==='transparent'?null:S.col})});
-const d=await r.json();clearInterval(iv);pb.style.width='100%';
-if(d.success){document.getElementById('resimg').src=d.image;
-setTimeout(()=>{document.getElementById('proc').style.display='none';document.getElementById('res').classList.add('vis')},400)}
-else{err(d.error);document.getElementById('procbtn').disabled=false;document.getElementById('progc').classList.remove('vis')}}
+const d=await r.json();alive=false;pb.style.width='100%';
+if(d.success){$.resimg.src=d.image;
+setTimeout(()=>{$.proc.style.display='none';$.res.classList.add('vis')},400)}
+else{err(d.error);$.procbtn.disabled=false;$.progc.classList.remove('vis')}}
 
 function dl(){if(S.sid)window.location.href='/download/'+S.sid}
 function dlSheet(){if(S.sid)window.location.href='/download-sheet/'+S.sid}
-function dlOrig(){if(S.sid)window.location.href='/download-original/'+S.sid}
+function dlOrig(){
+if(lurl){const a=document.createElement('a');a.href=lurl;a.download=pfile.name.replace(/\\.[^.]*$/,'')+'_cropped.jpg';a.click()}
+else if(S.sid)window.location.href='/download-original/'+S.sid}
+
+// Without background removal the crop + resize can run in the browser from the
+// local file, skipping the server round-trip. Same window math as apply_crop /
+// resize_crop; null (server fallback) if unsupported or if the browser applied
+// EXIF rotation and the decoded size no longer matches the server's.
+async function cropLocally(){
+if(!pfile||!window.OffscreenCanvas||!window.createImageBitmap)return null;
+let bmp;try{bmp=await createImageBitmap(pfile,{imageOrientation:'none'})}catch(e){return null}
+if(bmp.width!==S.iw||bmp.height!==S.ih){bmp.close();return null}
+let sx,sy,sw,sh;const c=S.crop;
+if(c){sx=Math.max(0,-c.offsetX/c.scale);sy=Math.max(0,-c.offsetY/c.scale);
+sw=Math.min(c.canvasW/c.scale,S.iw-sx);sh=Math.min(c.canvasH/c.scale,S.ih-sy)}
+else{const s=Math.max(S.tw/S.iw,S.th/S.ih);sw=S.tw/s;sh=S.th/s;sx=(S.iw-sw)/2;sy=(S.ih-sh)/2}
+const off=new OffscreenCanvas(S.tw,S.th),oc=off.getContext('2d');oc.imageSmoothingQuality='high';
+oc.drawImage(bmp,sx,sy,sw,sh,0,0,S.tw,S.th);bmp.close();
+try{return await off.convertToBlob({type:'image/jpeg',quality:0.92})}catch(e){return null}}
 
 async function skipAndDownload(){
-hide();document.getElementById('skipbtn').disabled=true;
-document.getElementById('progc').classList.add('vis');
-document.getElementById('progt').textContent='Processing image...';
-const pb=document.getElementById('prog');pb.style.width='50%';
+hide();$.skipbtn.disabled=true;
+$.progc.classList.add('vis');
+$.progt.textContent='Processing image...';
+const pb=$.prog;pb.style.width='50%';
+let d;const blob=await cropLocally();
+if(blob){if(lurl)URL.revokeObjectURL(lurl);lurl=URL.createObjectURL(blob);d={success:true,image:lurl}}
+else{
 await fetch('/set-size',{method:'POST',headers:{'Content-Type':'application/json'},
 body:JSON.stringify({session_id:S.sid,size:S.sz})});
 const r=await fetch('/download-cropped',{method:'POST',headers:{'Content-Type':'application/json'},
 body:JSON.stringify({session_id:S.sid})});
-const d=await r.json();pb.style.width='100%';
-if(d.success){document.getElementById('resimg').src=d.image;
-document.getElementById('res').querySelector('.resok').innerHTML='✅ Image ready (original background)';
-document.getElementById('res').querySelector('.btng').innerHTML='<button class="btn btn-s" onclick="startOver()">Start Over</button><button class="btn btn-ok" onclick="dlOrig()">⬇️ Download JPG</button>';
-setTimeout(()=>{document.getElementById('proc').style.display='none';document.getElementById('res').classList.add('vis')},400)}
-else{err(d.error);document.getElementById('skipbtn').disabled=false;document.getElementById('progc').classList.remove('vis')}}
+d=await r.json()}
+pb.style.width='100%';
+if(d.success){$.resimg.src=d.image;
+$.res.querySelector('.resok').innerHTML='✅ Image ready (original background)';
+$.res.querySelector('.btng').innerHTML='<button class="btn btn-s" onclick="startOver()">Start Over</button><button class="btn btn-ok" onclick="dlOrig()">⬇️ Download JPG</button>';
+setTimeout(()=>{$.proc.style.display='none';$.res.classList.add('vis')},400)}
+else{err(d.error);$.skipbtn.disabled=false;$.progc.classList.remove('vis')}}
 
 function go(n){
 if(n===2&&!S.sid){err('Upload an image first');return}
 S.step=n;updSteps();
 document.querySelectorAll('.sec').forEach(s=>s.classList.remove('active'));
-document.getElementById('sec'+n).classList.add('active');
+$['sec'+n].classList.add('active');
 if(n===2)initCanvas()}
 
 function updSteps(){for(let i=1;i<=3;i++){
-const s=document.getElementById('s'+i);s.classList.remove('active','done');
+const s=$['s'+i];s.classList.remove('active','done');
 if(i<S.step){s.classList.add('done');s.onclick=()=>go(i)}
 else if(i===S.step)s.classList.add('active')}}
 
 function startOver(){
-S={step:1,sid:null,img:null,sz:'passport_us',col:'#ffffff',iw:0,ih:0,sc:1,ox:0,oy:0,tw:600,th:600,manual:false};
-document.getElementById('autoToggle').classList.remove('on');
-document.getElementById('szsel').value='passport_us';
+S=DEFAULT_STATE();
+// All DOM resets land in one frame, so the page restyles once
+requestAnimationFrame(()=>{
+$.autoToggle.classList.remove('on');
+$.szsel.value='passport_us';
 // Clean up auto-mode progress bar if exists
-const gp=document.querySelector('.gen-prog');if(gp)gp.remove();
-// Reset s1btn
-document.getElementById('s1btn').disabled=false;
-document.getElementById('s1btn').textContent='✨ Generate Photo';
+$.prev.querySelector('.gen-prog')?.remove();
+$.s1btn.disabled=false;
+$.s1btn.textContent='✨ Generate Photo';
 reset();
-document.getElementById('proc').style.display='block';document.getElementById('res').classList.remove('vis');
-document.getElementById('procbtn').disabled=false;go(1)}
+$.proc.style.display='block';$.res.classList.remove('vis');
+$.procbtn.disabled=false;go(1)})}
 
-function err(m){document.getElementById('errtxt').textContent=m;document.getElementById('err').classList.add('vis')}
-function hide(){document.getElementById('err').classList.remove('vis')}
+function err(m){$.errtxt.textContent=m;$.err.classList.add('vis')}
+function hide(){$.err.classList.remove('vis')}
+
+// Fade the steps in once the section scrolls into view, then stop observing
+const hiw=document.querySelector('.how-it-works');
+if('IntersectionObserver' in window){const io=new IntersectionObserver(es=>{if(es.some(x=>x.isIntersecting)){hiw.classList.add('in');io.disconnect()}},{rootMargin:'0px 0px -10% 0px'});io.observe(hiw)}
+else hiw.classList.add('in');
 </script>
 </body>
 </html>
 '''
 
-ABOUT_TEMPLATE = '''<!DOCTYPE html>
+# Shell for the non-app pages: shared head, stylesheet, navbar and footer;
+# a page only contributes its title, description, CSS and body
+_PAGE_HEAD = '''<!DOCTYPE html>
 <html lang="en" data-theme="light">
 <head>
 <meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
-<link rel="icon" type="image/svg+xml" href="data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'%3E%3Crect width='32' height='32' rx='6' fill='%236366f1'/%3E%3Crect x='6' y='8' width='20' height='16' rx='2' fill='%23fff'/%3E%3Ccircle cx='16' cy='16' r='5' fill='%236366f1'/%3E%3Ccircle cx='16' cy='16' r='3' fill='%23818cf8'/%3E%3Crect x='20' y='10' width='4' height='2' rx='1' fill='%236366f1'/%3E%3C/svg%3E">
-<title>About - Passport Photo Editor</title>
-<meta name="description" content="Learn about Passport Photo Editor - why we built it and our mission to provide free passport photos.">
-<meta name="robots" content="index, follow">
-<link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
-<style>
-:root{--t:0.2s ease}
+<link rel="icon" type="image/svg+xml" href="/favicon.svg">
+'''
+
+_PAGE_META = '''<meta name="robots" content="index, follow">
+<script>document.documentElement.dataset.theme=matchMedia('(prefers-color-scheme:dark)').matches?'dark':'light'</script>
+<script src="/static/theme.js" defer></script>
+<link rel="preload" href="/static/fonts/InterVariable.woff2" as="font" type="font/woff2" crossorigin>
+'''
+
+_PAGE_CSS = '''@font-face{font-family:Inter;font-style:normal;font-weight:400 700;font-display:swap;src:url(/static/fonts/InterVariable.woff2) format('woff2')}
+:root{--t:0.2s ease;--g:linear-gradient(135deg,var(--ac),var(--ac2))}
 [data-theme="dark"]{--bg:#09090b;--bg2:#18181b;--bg3:#27272a;--tx:#fafafa;--tx2:#a1a1aa;--tx3:#71717a;--bd:#27272a;--ac:#6366f1;--ac2:#818cf8;--sh:0 4px 12px rgba(0,0,0,0.4)}
 [data-theme="light"]{--bg:#fff;--bg2:#fafafa;--bg3:#f4f4f5;--tx:#18181b;--tx2:#52525b;--tx3:#a1a1aa;--bd:#e4e4e7;--ac:#6366f1;--ac2:#4f46e5;--sh:0 4px 12px rgba(0,0,0,0.08)}
 *{margin:0;padding:0;box-sizing:border-box}
@@ -943,42 +1829,54 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .nav-logo{width:32px;height:32px;background:var(--ac);border-radius:8px;display:flex;align-items:center;justify-content:center;font-size:14px}
 .nav-brand{font-weight:600;font-size:0.95rem;color:var(--tx)}
 .nav-right{display:flex;align-items:center;gap:20px}
-.nav-link{color:var(--tx2);text-decoration:none;font-size:0.85rem;font-weight:500;transition:color var(--t)}
+.nav-link{color:var(--tx2);text-decoration:none;font-size:0.85rem;font-weight:500}
 .nav-link:hover{color:var(--ac)}
-.nav-btn{display:inline-flex;align-items:center;gap:6px;padding:8px 14px;background:linear-gradient(135deg,#ec4899,#f472b6);color:#fff;text-decoration:none;border-radius:20px;font-size:0.8rem;font-weight:500;transition:all var(--t)}
+.nav-btn{display:inline-flex;align-items:center;gap:6px;padding:8px 14px;background:linear-gradient(135deg,#ec4899,#f472b6);color:#fff;text-decoration:none;border-radius:20px;font-size:0.8rem;font-weight:500;transition:transform var(--t),box-shadow var(--t)}
 .nav-btn:hover{transform:translateY(-1px);box-shadow:0 4px 12px rgba(236,72,153,0.3)}
 .thm{width:44px;height:24px;background:var(--bg3);border-radius:12px;cursor:pointer;position:relative;border:1px solid var(--bd)}
 .thm::after{content:'';position:absolute;width:18px;height:18px;background:var(--tx);border-radius:50%;top:2px;left:2px;transition:transform var(--t)}
 [data-theme="light"] .thm::after{transform:translateX(20px)}
 .content{max-width:720px;margin:0 auto;padding:60px 24px;flex:1;width:100%}
-.about-card{background:var(--bg2);border:1px solid var(--bd);border-radius:16px;padding:48px;box-shadow:var(--sh)}
-.about-card h1{font-size:1.75rem;font-weight:700;margin-bottom:24px;background:linear-gradient(135deg,var(--ac),var(--ac2));-webkit-background-clip:text;-webkit-text-fill-color:transparent;background-clip:text;text-align:center}
-.about-story h3{font-size:1.1rem;font-weight:600;margin-bottom:16px;color:var(--tx)}
-.about-story p{color:var(--tx2);line-height:1.8;margin-bottom:16px;font-size:0.95rem}
-.about-story strong{color:var(--tx);font-weight:600}
-.about-cta{margin-top:32px;text-align:center}
-.btn{display:inline-flex;align-items:center;justify-content:center;gap:8px;padding:12px 24px;border:none;border-radius:10px;font-size:0.9rem;font-weight:500;cursor:pointer;transition:all var(--t);font-family:inherit;text-decoration:none}
+.btn{display:inline-flex;align-items:center;justify-content:center;gap:8px;padding:12px 24px;border:none;border-radius:10px;font-size:0.9rem;font-weight:500;cursor:pointer;transition:transform var(--t),box-shadow var(--t),background var(--t);font-family:inherit;text-decoration:none}
 .btn-p{background:var(--ac);color:#fff}
 .btn-p:hover{background:var(--ac2);transform:translateY(-1px);box-shadow:var(--sh)}
 .footer{padding:16px 24px;text-align:center;font-size:0.75rem;color:var(--tx3);border-top:1px solid var(--bd)}
 .footer span{margin:0 6px;opacity:0.5}
 .footer a{color:var(--tx3);text-decoration:none}
 .footer a:hover{color:var(--ac)}
-@media(max-width:640px){.content{padding:32px 16px}.about-card{padding:32px 24px}}
-</style>
-</head>
-<body>
-<nav class="navbar">
+@media(max-width:640px){.content{padding:32px 16px}}
+'''
+
+_NAVBAR = '''<nav class="navbar">
 <div class="nav-left"><a href="/"><div class="nav-logo">📷</div><span class="nav-brand">Passport Photo Editor</span></a></div>
 <div class="nav-right">
-<a href="/about" class="nav-link">About</a>
-<a href="/contact" class="nav-link">Contact</a>
+<a href="/legal#about" class="nav-link">About</a>
+<a href="/legal#contact" class="nav-link">Contact</a>
 <a href="https://buymeacoffee.com/onestopshoppassportphotos" target="_blank" class="nav-btn">☕ Buy me a coffee</a>
-<div class="thm" onclick="toggleTheme()"></div>
+<div class="thm"></div>
 </div>
 </nav>
-<div class="content">
-<div class="about-card">
+'''
+
+_FOOTER = '''<footer class="footer">© 2026 Passport Photo Editor<span>·</span><a href="/legal#privacy">Privacy</a><span>·</span><a href="/legal#terms">Terms</a><span>·</span>Made with ❤️</footer>
+</body>
+</html>
+'''
+
+def _page(title, description, css, body):
+    """Assemble an info page from the shared head, styles, navbar and footer"""
+    return (f'{_PAGE_HEAD}<title>{title} - Passport Photo Editor</title>\n<meta name="description" content="{description}">\n'
+            f'{_PAGE_META}<style>\n{_PAGE_CSS}{css}\n</style>\n</head>\n<body>\n{_NAVBAR}<div class="content">\n{body}</div>\n{_FOOTER}')
+
+_ABOUT_CSS = '''.about-card{background:var(--bg2);border:1px solid var(--bd);border-radius:16px;padding:48px;box-shadow:var(--sh)}
+.about-card h1{font-size:1.75rem;font-weight:700;margin-bottom:24px;background:var(--g);background-clip:text;color:transparent;text-align:center}
+.about-story h3{font-size:1.1rem;font-weight:600;margin-bottom:16px;color:var(--tx)}
+.about-story p{color:var(--tx2);line-height:1.8;margin-bottom:16px;font-size:0.95rem}
+.about-story strong{color:var(--tx);font-weight:600}
+.about-cta{margin-top:32px;text-align:center}
+@media(max-width:640px){.about-card{padding:32px 24px}}'''
+
+_ABOUT_BODY = '''<div class="about-card">
 <h1>About</h1>
 <div class="about-story">
 <h3>Why I Built This</h3>
@@ -996,72 +1894,17 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 <a href="/" class="btn btn-p">Try It Free →</a>
 </div>
 </div>
-</div>
-<footer class="footer">© 2026 Passport Photo Editor<span>·</span><a href="/privacy-policy">Privacy</a><span>·</span><a href="/terms-of-service">Terms</a><span>·</span>Made with ❤️</footer>
-<script>
-function toggleTheme(){document.documentElement.dataset.theme=document.documentElement.dataset.theme==='dark'?'light':'dark'}
-</script>
-</body>
-</html>
 '''
 
-CONTACT_TEMPLATE = '''<!DOCTYPE html>
-<html lang="en" data-theme="light">
-<head>
-<meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
-<link rel="icon" type="image/svg+xml" href="data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'%3E%3Crect width='32' height='32' rx='6' fill='%236366f1'/%3E%3Crect x='6' y='8' width='20' height='16' rx='2' fill='%23fff'/%3E%3Ccircle cx='16' cy='16' r='5' fill='%236366f1'/%3E%3Ccircle cx='16' cy='16' r='3' fill='%23818cf8'/%3E%3Crect x='20' y='10' width='4' height='2' rx='1' fill='%236366f1'/%3E%3C/svg%3E">
-<title>Contact - Passport Photo Editor</title>
-<meta name="description" content="Contact Passport Photo Editor. Get in touch with questions or feedback.">
-<meta name="robots" content="index, follow">
-<link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
-<style>
-:root{--t:0.2s ease}
-[data-theme="dark"]{--bg:#09090b;--bg2:#18181b;--bg3:#27272a;--tx:#fafafa;--tx2:#a1a1aa;--tx3:#71717a;--bd:#27272a;--ac:#6366f1;--ac2:#818cf8;--sh:0 4px 12px rgba(0,0,0,0.4)}
-[data-theme="light"]{--bg:#fff;--bg2:#fafafa;--bg3:#f4f4f5;--tx:#18181b;--tx2:#52525b;--tx3:#a1a1aa;--bd:#e4e4e7;--ac:#6366f1;--ac2:#4f46e5;--sh:0 4px 12px rgba(0,0,0,0.08)}
-*{margin:0;padding:0;box-sizing:border-box}
-body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(--tx);min-height:100vh;transition:background var(--t),color var(--t);display:flex;flex-direction:column}
-.navbar{position:sticky;top:0;z-index:100;display:flex;justify-content:space-between;align-items:center;padding:12px 24px;background:var(--bg);border-bottom:1px solid var(--bd);backdrop-filter:blur(8px)}
-.nav-left{display:flex;align-items:center;gap:10px}
-.nav-left a{text-decoration:none;display:flex;align-items:center;gap:10px}
-.nav-logo{width:32px;height:32px;background:var(--ac);border-radius:8px;display:flex;align-items:center;justify-content:center;font-size:14px}
-.nav-brand{font-weight:600;font-size:0.95rem;color:var(--tx)}
-.nav-right{display:flex;align-items:center;gap:20px}
-.nav-link{color:var(--tx2);text-decoration:none;font-size:0.85rem;font-weight:500;transition:color var(--t)}
-.nav-link:hover{color:var(--ac)}
-.nav-btn{display:inline-flex;align-items:center;gap:6px;padding:8px 14px;background:linear-gradient(135deg,#ec4899,#f472b6);color:#fff;text-decoration:none;border-radius:20px;font-size:0.8rem;font-weight:500;transition:all var(--t)}
-.nav-btn:hover{transform:translateY(-1px);box-shadow:0 4px 12px rgba(236,72,153,0.3)}
-.thm{width:44px;height:24px;background:var(--bg3);border-radius:12px;cursor:pointer;position:relative;border:1px solid var(--bd)}
-.thm::after{content:'';position:absolute;width:18px;height:18px;background:var(--tx);border-radius:50%;top:2px;left:2px;transition:transform var(--t)}
-[data-theme="light"] .thm::after{transform:translateX(20px)}
-.content{max-width:720px;margin:0 auto;padding:60px 24px;flex:1;width:100%}
-.contact-card{background:var(--bg2);border:1px solid var(--bd);border-radius:16px;padding:48px;box-shadow:var(--sh)}
-.contact-card h1{font-size:1.75rem;font-weight:700;margin-bottom:24px;background:linear-gradient(135deg,var(--ac),var(--ac2));-webkit-background-clip:text;-webkit-text-fill-color:transparent;background-clip:text;text-align:center}
+_CONTACT_CSS = '''.contact-card{background:var(--bg2);border:1px solid var(--bd);border-radius:16px;padding:48px;box-shadow:var(--sh)}
+.contact-card h1{font-size:1.75rem;font-weight:700;margin-bottom:24px;background:var(--g);background-clip:text;color:transparent;text-align:center}
 .contact-card p{color:var(--tx2);line-height:1.8;margin-bottom:16px;font-size:0.95rem;text-align:center}
 .contact-card a{color:var(--ac);text-decoration:none}
 .contact-card a:hover{text-decoration:underline}
 .contact-cta{margin-top:32px;text-align:center}
-.btn{display:inline-flex;align-items:center;justify-content:center;gap:8px;padding:12px 24px;border:none;border-radius:10px;font-size:0.9rem;font-weight:500;cursor:pointer;transition:all var(--t);font-family:inherit;text-decoration:none}
-.btn-p{background:var(--ac);color:#fff}
-.btn-p:hover{background:var(--ac2);transform:translateY(-1px);box-shadow:var(--sh)}
-.footer{padding:16px 24px;text-align:center;font-size:0.75rem;color:var(--tx3);border-top:1px solid var(--bd)}
-.footer span{margin:0 6px;opacity:0.5}
-.footer a{color:var(--tx3);text-decoration:none}
-.footer a:hover{color:var(--ac)}
-@media(max-width:640px){.content{padding:32px 16px}.contact-card{padding:32px 24px}}
-</style>
-</head>
-<body>
-<nav class="navbar">
-<div class="nav-left"><a href="/"><div class="nav-logo">📷</div><span class="nav-brand">Passport Photo Editor</span></a></div>
-<div class="nav-right">
-<a href="/about" class="nav-link">About</a>
-<a href="/contact" class="nav-link">Contact</a>
-<a href="https://buymeacoffee.com/onestopshoppassportphotos" target="_blank" class="nav-btn">☕ Buy me a coffee</a>
-<div class="thm" onclick="toggleTheme()"></div>
-</div>
-</nav>
-<div class="content">
-<div class="contact-card">
+@media(max-width:640px){.contact-card{padding:32px 24px}}'''
+
+_CONTACT_BODY = '''<div class="contact-card">
 <h1>Contact</h1>
 <p>Have questions or feedback? I'd love to hear from you.</p>
 <p>Email: <a href="mailto:hello@passportphotoeditor.com">hello@passportphotoeditor.com</a></p>
@@ -1069,46 +1912,10 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 <a href="/" class="btn btn-p">← Back to Home</a>
 </div>
 </div>
-</div>
-<footer class="footer">© 2026 Passport Photo Editor<span>·</span><a href="/privacy-policy">Privacy</a><span>·</span><a href="/terms-of-service">Terms</a><span>·</span>Made with ❤️</footer>
-<script>
-function toggleTheme(){document.documentElement.dataset.theme=document.documentElement.dataset.theme==='dark'?'light':'dark'}
-</script>
-</body>
-</html>
 '''
 
-PRIVACY_TEMPLATE = '''<!DOCTYPE html>
-<html lang="en" data-theme="light">
-<head>
-<meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
-<link rel="icon" type="image/svg+xml" href="data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'%3E%3Crect width='32' height='32' rx='6' fill='%236366f1'/%3E%3Crect x='6' y='8' width='20' height='16' rx='2' fill='%23fff'/%3E%3Ccircle cx='16' cy='16' r='5' fill='%236366f1'/%3E%3Ccircle cx='16' cy='16' r='3' fill='%23818cf8'/%3E%3Crect x='20' y='10' width='4' height='2' rx='1' fill='%236366f1'/%3E%3C/svg%3E">
-<title>Privacy Policy - Passport Photo Editor</title>
-<meta name="description" content="Privacy Policy for Passport Photo Editor. Learn how we handle your data and protect your privacy.">
-<meta name="robots" content="index, follow">
-<link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
-<style>
-:root{--t:0.2s ease}
-[data-theme="dark"]{--bg:#09090b;--bg2:#18181b;--bg3:#27272a;--tx:#fafafa;--tx2:#a1a1aa;--tx3:#71717a;--bd:#27272a;--ac:#6366f1;--ac2:#818cf8;--sh:0 4px 12px rgba(0,0,0,0.4)}
-[data-theme="light"]{--bg:#fff;--bg2:#fafafa;--bg3:#f4f4f5;--tx:#18181b;--tx2:#52525b;--tx3:#a1a1aa;--bd:#e4e4e7;--ac:#6366f1;--ac2:#4f46e5;--sh:0 4px 12px rgba(0,0,0,0.08)}
-*{margin:0;padding:0;box-sizing:border-box}
-body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(--tx);min-height:100vh;transition:background var(--t),color var(--t);display:flex;flex-direction:column}
-.navbar{position:sticky;top:0;z-index:100;display:flex;justify-content:space-between;align-items:center;padding:12px 24px;background:var(--bg);border-bottom:1px solid var(--bd);backdrop-filter:blur(8px)}
-.nav-left{display:flex;align-items:center;gap:10px}
-.nav-left a{text-decoration:none;display:flex;align-items:center;gap:10px}
-.nav-logo{width:32px;height:32px;background:var(--ac);border-radius:8px;display:flex;align-items:center;justify-content:center;font-size:14px}
-.nav-brand{font-weight:600;font-size:0.95rem;color:var(--tx)}
-.nav-right{display:flex;align-items:center;gap:20px}
-.nav-link{color:var(--tx2);text-decoration:none;font-size:0.85rem;font-weight:500;transition:color var(--t)}
-.nav-link:hover{color:var(--ac)}
-.nav-btn{display:inline-flex;align-items:center;gap:6px;padding:8px 14px;background:linear-gradient(135deg,#ec4899,#f472b6);color:#fff;text-decoration:none;border-radius:20px;font-size:0.8rem;font-weight:500;transition:all var(--t)}
-.nav-btn:hover{transform:translateY(-1px);box-shadow:0 4px 12px rgba(236,72,153,0.3)}
-.thm{width:44px;height:24px;background:var(--bg3);border-radius:12px;cursor:pointer;position:relative;border:1px solid var(--bd)}
-.thm::after{content:'';position:absolute;width:18px;height:18px;background:var(--tx);border-radius:50%;top:2px;left:2px;transition:transform var(--t)}
-[data-theme="light"] .thm::after{transform:translateX(20px)}
-.content{max-width:720px;margin:0 auto;padding:60px 24px;flex:1;width:100%}
-.policy-card{background:var(--bg2);border:1px solid var(--bd);border-radius:16px;padding:48px;box-shadow:var(--sh)}
-.policy-card h1{font-size:1.75rem;font-weight:700;margin-bottom:8px;background:linear-gradient(135deg,var(--ac),var(--ac2));-webkit-background-clip:text;-webkit-text-fill-color:transparent;background-clip:text;text-align:center}
+_POLICY_CSS = '''.policy-card{background:var(--bg2);border:1px solid var(--bd);border-radius:16px;padding:48px;box-shadow:var(--sh)}
+.policy-card h1{font-size:1.75rem;font-weight:700;margin-bottom:8px;background:var(--g);background-clip:text;color:transparent;text-align:center}
 .effective-date{text-align:center;color:var(--tx3);font-size:0.875rem;margin-bottom:32px}
 .policy-intro{color:var(--tx2);line-height:1.8;margin-bottom:32px;font-size:0.95rem}
 .policy-section{margin-bottom:28px}
@@ -1122,25 +1929,9 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 .policy-footer p{color:var(--tx3);font-size:0.875rem;margin-bottom:16px}
 .policy-footer a{color:var(--ac);text-decoration:none;font-weight:500}
 .policy-footer a:hover{text-decoration:underline}
-.footer{padding:16px 24px;text-align:center;font-size:0.75rem;color:var(--tx3);border-top:1px solid var(--bd)}
-.footer span{margin:0 6px;opacity:0.5}
-.footer a{color:var(--tx3);text-decoration:none}
-.footer a:hover{color:var(--ac)}
-@media(max-width:640px){.content{padding:32px 16px}.policy-card{padding:32px 24px}}
-</style>
-</head>
-<body>
-<nav class="navbar">
-<div class="nav-left"><a href="/"><div class="nav-logo">📷</div><span class="nav-brand">Passport Photo Editor</span></a></div>
-<div class="nav-right">
-<a href="/about" class="nav-link">About</a>
-<a href="/contact" class="nav-link">Contact</a>
-<a href="https://buymeacoffee.com/onestopshoppassportphotos" target="_blank" class="nav-btn">☕ Buy me a coffee</a>
-<div class="thm" onclick="toggleTheme()"></div>
-</div>
-</nav>
-<div class="content">
-<div class="policy-card">
+@media(max-width:640px){.policy-card{padding:32px 24px}}'''
+
+_PRIVACY_BODY = '''<div class="policy-card">
 <h1>Privacy Policy</h1>
 <p class="effective-date"><strong>Effective Date:</strong> February 18, 2026</p>
 
@@ -1186,88 +1977,21 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 
 <div class="policy-section">
 <h2>7. Contact Information</h2>
-<p>If you have any questions or concerns about this Privacy Policy, please visit the <a href="/#contact">Contact Page</a> to get in touch with me.</p>
+<p>If you have any questions or concerns about this Privacy Policy, please visit the <a href="/legal#contact">Contact Page</a> to get in touch with me.</p>
 </div>
 
 <div class="policy-footer">
-<p>This Privacy Policy should be read in conjunction with our <a href="/terms-of-service">Terms of Service</a>.</p>
+<p>This Privacy Policy should be read in conjunction with our <a href="/legal#terms">Terms of Service</a>.</p>
 <a href="/">Return to Home</a>
 </div>
 </div>
-</div>
-<footer class="footer">© 2026 Passport Photo Editor<span>·</span><a href="/privacy-policy">Privacy</a><span>·</span><a href="/terms-of-service">Terms</a><span>·</span>Made with ❤️</footer>
-<script>
-function toggleTheme(){document.documentElement.dataset.theme=document.documentElement.dataset.theme==='dark'?'light':'dark'}
-</script>
-</body>
-</html>
 '''
 
-TERMS_TEMPLATE = '''<!DOCTYPE html>
-<html lang="en" data-theme="light">
-<head>
-<meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
-<link rel="icon" type="image/svg+xml" href="data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'%3E%3Crect width='32' height='32' rx='6' fill='%236366f1'/%3E%3Crect x='6' y='8' width='20' height='16' rx='2' fill='%23fff'/%3E%3Ccircle cx='16' cy='16' r='5' fill='%236366f1'/%3E%3Ccircle cx='16' cy='16' r='3' fill='%23818cf8'/%3E%3Crect x='20' y='10' width='4' height='2' rx='1' fill='%236366f1'/%3E%3C/svg%3E">
-<title>Terms of Service - Passport Photo Editor</title>
-<meta name="description" content="Terms of Service for Passport Photo Editor. Read our terms and conditions for using the service.">
-<meta name="robots" content="index, follow">
-<link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
-<style>
-:root{--t:0.2s ease}
-[data-theme="dark"]{--bg:#09090b;--bg2:#18181b;--bg3:#27272a;--tx:#fafafa;--tx2:#a1a1aa;--tx3:#71717a;--bd:#27272a;--ac:#6366f1;--ac2:#818cf8;--sh:0 4px 12px rgba(0,0,0,0.4)}
-[data-theme="light"]{--bg:#fff;--bg2:#fafafa;--bg3:#f4f4f5;--tx:#18181b;--tx2:#52525b;--tx3:#a1a1aa;--bd:#e4e4e7;--ac:#6366f1;--ac2:#4f46e5;--sh:0 4px 12px rgba(0,0,0,0.08)}
-*{margin:0;padding:0;box-sizing:border-box}
-body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(--tx);min-height:100vh;transition:background var(--t),color var(--t);display:flex;flex-direction:column}
-.navbar{position:sticky;top:0;z-index:100;display:flex;justify-content:space-between;align-items:center;padding:12px 24px;background:var(--bg);border-bottom:1px solid var(--bd);backdrop-filter:blur(8px)}
-.nav-left{display:flex;align-items:center;gap:10px}
-.nav-left a{text-decoration:none;display:flex;align-items:center;gap:10px}
-.nav-logo{width:32px;height:32px;background:var(--ac);border-radius:8px;display:flex;align-items:center;justify-content:center;font-size:14px}
-.nav-brand{font-weight:600;font-size:0.95rem;color:var(--tx)}
-.nav-right{display:flex;align-items:center;gap:20px}
-.nav-link{color:var(--tx2);text-decoration:none;font-size:0.85rem;font-weight:500;transition:color var(--t)}
-.nav-link:hover{color:var(--ac)}
-.nav-btn{display:inline-flex;align-items:center;gap:6px;padding:8px 14px;background:linear-gradient(135deg,#ec4899,#f472b6);color:#fff;text-decoration:none;border-radius:20px;font-size:0.8rem;font-weight:500;transition:all var(--t)}
-.nav-btn:hover{transform:translateY(-1px);box-shadow:0 4px 12px rgba(236,72,153,0.3)}
-.thm{width:44px;height:24px;background:var(--bg3);border-radius:12px;cursor:pointer;position:relative;border:1px solid var(--bd)}
-.thm::after{content:'';position:absolute;width:18px;height:18px;background:var(--tx);border-radius:50%;top:2px;left:2px;transition:transform var(--t)}
-[data-theme="light"] .thm::after{transform:translateX(20px)}
-.content{max-width:720px;margin:0 auto;padding:60px 24px;flex:1;width:100%}
-.policy-card{background:var(--bg2);border:1px solid var(--bd);border-radius:16px;padding:48px;box-shadow:var(--sh)}
-.policy-card h1{font-size:1.75rem;font-weight:700;margin-bottom:8px;background:linear-gradient(135deg,var(--ac),var(--ac2));-webkit-background-clip:text;-webkit-text-fill-color:transparent;background-clip:text;text-align:center}
-.effective-date{text-align:center;color:var(--tx3);font-size:0.875rem;margin-bottom:32px}
-.policy-intro{color:var(--tx2);line-height:1.8;margin-bottom:32px;font-size:0.95rem}
-.policy-section{margin-bottom:28px}
-.policy-section h2{font-size:1.1rem;font-weight:600;margin-bottom:12px;color:var(--tx)}
-.policy-section p{color:var(--tx2);line-height:1.8;margin-bottom:12px;font-size:0.95rem}
-.policy-section ul{color:var(--tx2);line-height:1.8;margin-left:24px;margin-bottom:12px;font-size:0.95rem}
-.policy-section li{margin-bottom:6px}
-.policy-section a{color:var(--ac);text-decoration:none}
-.policy-section a:hover{text-decoration:underline}
-.policy-footer{margin-top:40px;padding-top:24px;border-top:1px solid var(--bd);text-align:center}
-.policy-footer p{color:var(--tx3);font-size:0.875rem;margin-bottom:16px}
-.policy-footer a{color:var(--ac);text-decoration:none;font-weight:500}
-.policy-footer a:hover{text-decoration:underline}
+_TERMS_CSS = _POLICY_CSS + '''
 .agreement-note{background:var(--bg3);border-radius:10px;padding:16px 20px;margin-top:32px;text-align:center}
-.agreement-note p{color:var(--tx2);font-size:0.9rem;margin:0}
-.footer{padding:16px 24px;text-align:center;font-size:0.75rem;color:var(--tx3);border-top:1px solid var(--bd)}
-.footer span{margin:0 6px;opacity:0.5}
-.footer a{color:var(--tx3);text-decoration:none}
-.footer a:hover{color:var(--ac)}
-@media(max-width:640px){.content{padding:32px 16px}.policy-card{padding:32px 24px}}
-</style>
-</head>
-<body>
-<nav class="navbar">
-<div class="nav-left"><a href="/"><div class="nav-logo">📷</div><span class="nav-brand">Passport Photo Editor</span></a></div>
-<div class="nav-right">
-<a href="/about" class="nav-link">About</a>
-<a href="/contact" class="nav-link">Contact</a>
-<a href="https://buymeacoffee.com/onestopshoppassportphotos" target="_blank" class="nav-btn">☕ Buy me a coffee</a>
-<div class="thm" onclick="toggleTheme()"></div>
-</div>
-</nav>
-<div class="content">
-<div class="policy-card">
+.agreement-note p{color:var(--tx2);font-size:0.9rem;margin:0}'''
+
+_TERMS_BODY = '''<div class="policy-card">
 <h1>Terms of Service</h1>
 <p class="effective-date"><strong>Effective Date:</strong> February 18, 2026</p>
 
@@ -1292,7 +2016,7 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 <ul>
 <li><strong>Temporary Processing:</strong> Your photos are processed on our servers only during your active session. We do not permanently store your photos.</li>
 <li><strong>No Data Collection:</strong> We do not collect personal data through the photo processing service beyond what is necessary to provide the service.</li>
-<li>For complete information about our data practices, please see our <a href="/privacy-policy">Privacy Policy</a>.</li>
+<li>For complete information about our data practices, please see our <a href="/legal#privacy">Privacy Policy</a>.</li>
 </ul>
 </div>
 
@@ -1322,7 +2046,7 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 
 <div class="policy-section">
 <h2>8. Contact Us</h2>
-<p>If you have any questions about these Terms, please <a href="/#contact">contact us</a>.</p>
+<p>If you have any questions about these Terms, please <a href="/legal#contact">contact us</a>.</p>
 </div>
 
 <div class="agreement-note">
@@ -1333,16 +2057,61 @@ body{font-family:Inter,-apple-system,sans-serif;background:var(--bg);color:var(-
 <a href="/">Return to Home</a>
 </div>
 </div>
-</div>
-<footer class="footer">© 2026 Passport Photo Editor<span>·</span><a href="/privacy-policy">Privacy</a><span>·</span><a href="/terms-of-service">Terms</a><span>·</span>Made with ❤️</footer>
-<script>
-function toggleTheme(){document.documentElement.dataset.theme=document.documentElement.dataset.theme==='dark'?'light':'dark'}
-</script>
-</body>
-</html>
 '''
 
+_LEGAL_CSS = '''.legal-sec{margin-bottom:16px;scroll-margin-top:72px}
+.legal-sec>summary{cursor:pointer;font-size:1.1rem;font-weight:600;padding:12px 4px;color:var(--tx)}
+.legal-sec>summary:hover{color:var(--ac)}'''
+
+def _legal_section(anchor, title, body, open_=False):
+    """One collapsible section of /legal; the summary replaces the card heading"""
+    body = body.replace(f'<h1>{title}</h1>\n', '', 1)
+    return f'<details id="{anchor}" class="legal-sec"{" open" if open_ else ""}><summary>{title}</summary>\n{body}</details>\n'
+
+# About, Contact, Privacy and Terms ship as one cached page; the old URLs
+# redirect to their section
+LEGAL_TEMPLATE = _page('About & Legal', 'About Passport Photo Editor, how to reach us, and our privacy policy and terms of service.',
+                       '\n'.join((_ABOUT_CSS, _CONTACT_CSS, _TERMS_CSS, _LEGAL_CSS)),
+                       _legal_section('about', 'About', _ABOUT_BODY, open_=True) +
+                       _legal_section('contact', 'Contact', _CONTACT_BODY) +
+                       _legal_section('privacy', 'Privacy Policy', _PRIVACY_BODY) +
+                       _legal_section('terms', 'Terms of Service', _TERMS_BODY))
+
+_INDEX_PAGE = precompile_page(HTML_TEMPLATE.replace('__SIZES__', '[' + ','.join(
+    f"['{key}',[{w},{h}]]" for key, spec in PHOTO_SPECS.items() for w, h in [spec.size]) + ']'))
+_LEGAL_PAGE = precompile_page(LEGAL_TEMPLATE)
+# Only the encoded bytes are served. The emoji make these str sources 4 bytes
+# per character, so don't keep them alive for the life of the worker.
+del HTML_TEMPLATE, LEGAL_TEMPLATE
+_STATIC_PAGES = {'index': _INDEX_PAGE, 'legal': _LEGAL_PAGE}
+
+# Static pages skip Flask routing and request contexts entirely; the routes
+# above remain as the fallback for anything the shortcut passes through
+app.wsgi_app = StaticPageShortcut(app.wsgi_app, {'/' if name == 'index' else '/' + name: page
+                                                 for name, page in _STATIC_PAGES.items()})
+
+_ENC_SUFFIX = {None: '', 'gzip': '.gz', 'br': '.br'}
+
+def export_static_pages(out_dir):
+    """Write every precompiled page plus .gz/.br siblings for a CDN or nginx gzip_static/brotli_static"""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    for name, page in _STATIC_PAGES.items():
+        for enc, (data, _) in page.items():
+            (out / (name + '.html' + _ENC_SUFFIX[enc])).write_bytes(data)
+    logger.info(f"📦 Exported {len(_STATIC_PAGES)} pages to {out}")
+
 if __name__ == '__main__':
+    # python server.py --export-static [dir]: build step for serving the pages from a CDN
+    if sys.argv[1:2] == ['--export-static']:
+        export_static_pages(sys.argv[2] if len(sys.argv) > 2 else 'static/pages')
+        sys.exit(0)
     port = int(os.environ.get('PORT', 8000))
     print(f"\\n🚀 Passport Photo Editor Server\\n📍 http://localhost:{port}\\n")
-    app.run(host='0.0.0.0', port=port, debug=False)
+    # Production deployments use gunicorn.conf.py; for a direct run prefer
+    # waitress over the Werkzeug dev server when it is installed
+    try:
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=port, threads=8)
+    except ImportError:
+        app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
@@ -0,0 +1,5 @@
+// Light/dark toggle shared by every page
+document.querySelector('.thm').addEventListener('click',()=>{const d=document.documentElement.dataset;d.theme=d.theme==='dark'?'light':'dark'});
+// /legal#section: open the collapsed section the fragment points at
+const openHash=()=>{const d=location.hash&&document.getElementById(location.hash.slice(1));if(d&&d.tagName==='DETAILS')d.open=true};
+openHash();addEventListener('hashchange',openHash);